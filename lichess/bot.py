@@ -1,7 +1,17 @@
-import os, berserk
+import logging, os, queue, threading, berserk
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from lichess.game import Game
 
+log = logging.getLogger(__name__)
+
+# Stack size for threads we spawn (games, dispatcher, pool workers). Linux reserves
+# 8 MiB per thread by default, far more than our (shallow) search recursion needs
+THREAD_STACK_SIZE = 2 * 1024 * 1024
+
+# Incoming events waiting to be handled, events are dropped once this is full
+EVENT_QUEUE_SIZE = 64
+
 
 class LichessBot:
     def __init__(self):
@@ -16,15 +26,57 @@ class LichessBot:
 
         session = berserk.TokenSession(token)
         self.client = berserk.Client(session=session)
-        assert self.client.account.get()["title"] == "BOT"
+
+        # Fetch account once, rather than once per game
+        self.account = self.client.account.get()
+        if self.account.get("title") != "BOT":
+            raise ValueError("Lichess account must be upgraded to a BOT account")
+
+        threading.stack_size(THREAD_STACK_SIZE)
+
+        # Shared by all games for fire-and-forget requests (e.g. chat messages)
+        self.pool = ThreadPoolExecutor(max_workers=4)
+
+        # Decouples reading the event stream from handling events (network calls)
+        self.events = queue.Queue(maxsize=EVENT_QUEUE_SIZE)
 
     def run(self):
+        threading.Thread(target=self.dispatch_events, daemon=True).start()
+
         for event in self.client.bots.stream_incoming_events():
-            print(f"\nReceived event: {event}\n`")
-            event_type = event["type"]
-            if event_type == "challenge":
-                event_id = event["challenge"]["id"]
-                self.client.bots.accept_challenge(event_id)
-            elif event_type == "gameStart":
-                game = Game(self.client, event["game"])
-                game.start()
+            log.debug("Received event: %s", event)
+            try:
+                self.events.put_nowait(event)
+            except queue.Full:
+                log.warning("Event queue is full, dropping event: %s", event)
+
+    def dispatch_events(self):
+        # Incoming event type -> handler
+        handlers = {
+            "challenge": self.handle_challenge,
+            "gameStart": self.handle_game_start,
+        }
+        while True:
+            event = self.events.get()
+            handler = handlers.get(event["type"])
+            try:
+                if handler:
+                    handler(event)
+            except Exception:
+                # E.g. accepting a challenge that was cancelled in the meantime.
+                # Keep dispatching, later events must still be handled
+                log.exception("Failed to handle event: %s", event)
+            finally:
+                self.events.task_done()
+
+    def handle_challenge(self, event):
+        self.client.bots.accept_challenge(event["challenge"]["id"])
+
+    def handle_game_start(self, event):
+        game = Game(
+            self.client,
+            event["game"],
+            username=self.account["username"],
+            pool=self.pool,
+        )
+        game.start()
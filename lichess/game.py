@@ -1,47 +1,130 @@
+import logging
+import random
 import threading
-from src import Board, Move, RandomAgent, MinimaxAgent
+from concurrent.futures import Executor
+from time import monotonic
+from src import Board, RandomAgent, MinimaxAgent
+from src.core.board import STARTING_FEN
 from lichess.messages import (
     generate_chat_response,
-    GREETINGS,
+    generate_greetings,
     generate_game_over_response,
 )
 
+log = logging.getLogger(__name__)
+
+# Time management: spend roughly 1/MOVES_TO_GO of the remaining clock (plus increment)
+MOVES_TO_GO = 40
+# Don't start another iterative deepening iteration once this fraction of the budget is used,
+# as the next (deeper) iteration will almost certainly not finish in time
+ITERATION_BUDGET_FRACTION = 0.5
+# Clock time kept back for network lag and move overhead: the increment is only
+# added once the move is made, so the budget must fit in the clock left minus this
+MOVE_OVERHEAD_MS = 300
+
+# Chat commands to change difficulty: command -> (mode, response template)
+DIFFICULTY_COMMANDS = {
+    "easy": (
+        "easy",
+        "Alright {username}, letting you off easy! Switching to Random Agent mode. Don't get too comfy!",
+    ),
+    "medium": (
+        "medium",
+        "You got it, {username}! Switching to Minimax Agent mode. Time to step up your game!",
+    ),
+    "hard": (
+        "hard",
+        "Brace yourself, {username}! Switching to Hard Minimax Agent mode. This won't be easy!",
+    ),
+}
+# Longer messages can't be commands (longest command plus some whitespace)
+MAX_COMMAND_LENGTH = 8
+
 
 class Game(threading.Thread):
-    def __init__(self, client, event, **kwargs):
+    # Thread instances still get a __dict__, but our own attributes are read
+    # through slot descriptors on the hot per-event path
+    __slots__ = (
+        "game_id",
+        "client",
+        "pool",
+        "stream",
+        "color",
+        "is_my_turn",
+        "username",
+        "opponent_username",
+        "board",
+        "agent",
+        "depth",
+        "time_ms",
+        "inc_ms",
+        "_applied_ply",
+        "_rng",
+        "_handlers",
+    )
+
+    def __init__(self, client, event, username: str, pool: Executor, **kwargs):
         super().__init__(**kwargs)
         self.game_id = event["id"]
         self.client = client
+        self.pool = pool
+        # Lazy generator, nothing is read from the network until run() iterates it
         self.stream = client.bots.stream_game_state(self.game_id)
-        self.current_state = next(self.stream)
         self.color = event["color"]
-        self.username = client.account.get()["username"]
+        self.is_my_turn = event["isMyTurn"]
+        self.username = username
         self.opponent_username = event["opponent"]["username"]
+        # Per-game RNG for chat responses, so games don't contend on the shared one
+        self._rng = random.Random()
 
         self.board = Board()
-        self.board.from_fen(event["fen"])
+        if event["fen"] == STARTING_FEN:
+            self.board.setup_initial_position()  # Skips parsing the FEN
+        else:
+            self.board.from_fen(event["fen"])
 
         # Default to medium difficulty
         self.agent = MinimaxAgent(self.board)
         self.depth = 2
 
-        # Tell user they can change the bot agent at any time via chat
-        for greeting in GREETINGS:
-            self.client.bots.post_message(
-                self.game_id,
-                greeting.replace("{{username}}", self.opponent_username),
-            )
+        # Remaining clock time and increment in milliseconds (None if untimed)
+        seconds_left = event.get("secondsLeft")
+        self.time_ms = seconds_left * 1000 if seconds_left is not None else None
+        self.inc_ms = 0
 
-        if event["isMyTurn"]:
-            self.make_move()
+        # Number of plies (from the game's initial position) applied to self.board,
+        # set from the first stream frame in handle_game_full
+        self._applied_ply = 0
+
+        # Game stream event type -> handler
+        self._handlers = {
+            "gameFull": self.handle_game_full,
+            "gameState": self.handle_state_change,
+            "chatLine": self.handle_chat_line,
+        }
 
     def run(self):
+        # Tell user they can change the bot agent at any time via chat.
+        # Lichess caps chat lines at 140 characters, so the greetings can't be joined
+        # into one message: post the first one now and the rest in the background,
+        # so they don't delay our first move
+        first_greeting, *other_greetings = generate_greetings(self.opponent_username)
+        self.client.bots.post_message(self.game_id, first_greeting)
+        self.pool.submit(self.post_messages, other_greetings)
+
         for event in self.stream:
-            print(f"\nReceived game event: {event}\n")
-            if event["type"] == "gameState":
-                self.handle_state_change(event)
-            elif event["type"] == "chatLine":
-                self.handle_chat_line(event)
+            log.debug("Received game event: %s", event)
+            handler = self._handlers.get(event["type"])
+            if handler:
+                handler(event)
+
+    def handle_game_full(self, event):
+        # Moves played so far are already part of the FEN from the gameStart event
+        moves = event["state"]["moves"]
+        self._applied_ply = moves.count(" ") + 1 if moves else 0
+
+        if self.is_my_turn:
+            self.make_move()
 
     def handle_chat_line(self, event):
         username = event["username"]
@@ -49,22 +132,23 @@ class Game(threading.Thread):
             return  # Ignore own messages
 
         text = event["text"]
-        response = generate_chat_response(username, text)  # Default response
+        response = generate_chat_response(username, text, self._rng)  # Default response
 
         # Check message for difficulty commands, and override response
         # TODO: Add more difficulty levels later, such as "magnus carlsen" mode
-        text_lower = text.lower().strip()
-        if text_lower == "easy":
-            self.set_easy_mode()
-            response = f"Alright {username}, letting you off easy! Switching to Random Agent mode. Don't get too comfy!"
-        elif text_lower == "medium":
-            self.set_medium_mode()
-            response = f"You got it, {username}! Switching to Minimax Agent mode. Time to step up your game!"
-        elif text_lower == "hard":
-            self.set_hard_mode()
-            response = f"Brace yourself, {username}! Switching to Hard Minimax Agent mode. This won't be easy!"
-
-        self.client.bots.post_message(self.game_id, response)
+        if len(text) <= MAX_COMMAND_LENGTH:
+            handler = DIFFICULTY_COMMANDS.get(text.strip().lower())
+            if handler:
+                mode, response_template = handler
+                getattr(self, f"set_{mode}_mode")()
+                response = response_template.format(username=username)
+
+        # Fire-and-forget, so that the stream isn't blocked on the request
+        self.pool.submit(self.client.bots.post_message, self.game_id, response)
+
+    def post_messages(self, messages: list[str]):
+        for message in messages:
+            self.client.bots.post_message(self.game_id, message)
 
     def set_easy_mode(self):
         self.agent = RandomAgent(self.board)
@@ -84,6 +168,23 @@ class Game(threading.Thread):
             self.handle_game_over(self.game_id, status, winner)
             return
 
+        # Count plies without splitting the (ever growing) move list
+        moves = game_state["moves"]
+        ply = moves.count(" ") + 1 if moves else 0
+        new_plies = ply - self._applied_ply
+        if new_plies <= 0:
+            return  # No new move since the last event (e.g. our own move echoed back)
+
+        # Apply only the moves we haven't seen yet, splitting from the right
+        for uci_move in moves.rsplit(" ", new_plies)[-new_plies:]:
+            self.board.make_move(self.board.get_move_from_uci(uci_move))
+        self._applied_ply = ply
+
+        # Exit early if it's not our turn (white moves after an even number of plies)
+        if (ply & 1) ^ (self.color == "black"):
+            return
+
+        # Only read the clock once we know we're going to use it
         time = (
             game_state.get("wtime")
             if self.color == "white"
@@ -92,40 +193,55 @@ class Game(threading.Thread):
         inc = (
             game_state.get("winc") if self.color == "white" else game_state.get("binc")
         )
-
-        # Exit early if it's not our turn
-        uci_moves = game_state["moves"].split()
-        should_move = (len(uci_moves) % 2 == 1 and self.color == "black") or (
-            len(uci_moves) % 2 == 0 and self.color == "white"
-        )
-        if not should_move:
-            return
-
-        # Capture opponent's last move
-        uci_move = uci_moves[-1]
-        assert uci_move is not None, "No moves in game state"
-        move = self.board.get_move_from_uci(uci_move)
-        self.board.make_move(move)
+        # berserk converts clock fields to timedeltas
+        self.time_ms = time.total_seconds() * 1000 if time is not None else None
+        self.inc_ms = inc.total_seconds() * 1000 if inc is not None else 0
 
         # Now agent's turn
         self.make_move()
 
     def make_move(self):
+        """
+        Search up to `self.depth` (the agent deepens iteratively), until the time
+        budget for this move runs out.
+        """
+        stop_event = self.agent.stop_event
+        stop_event.clear()
+
+        timer = None
+        self.agent.soft_deadline = None
+        if self.time_ms is not None:
+            budget_ms = move_budget_ms(self.time_ms, self.inc_ms)
+            # The agent polls this flag in its search instead of checking the clock
+            timer = threading.Timer(budget_ms / 1000, stop_event.set)
+            timer.daemon = True
+            timer.start()
+            self.agent.soft_deadline = (
+                monotonic() + budget_ms * ITERATION_BUDGET_FRACTION / 1000
+            )
+
         agent_move = self.agent.find_best_move(self.depth)
-        assert agent_move is not None, "No legal moves available"
+
+        if timer is not None:
+            timer.cancel()
+
+        if agent_move is None:
+            raise RuntimeError("No legal moves available")
         move_str = agent_move.to_uci()
         self.board.make_move(agent_move)
+        self._applied_ply += 1
         self.client.bots.make_move(self.game_id, move_str)
 
     def handle_game_over(self, game_id: str, status: str, winner: str | None) -> str:
-        assert status in (
+        if status not in (
             "aborted",
             "mate",
             "resign",
             "stalemate",
             "timeout",
             "draw",
-        ), f"Unknown game status: {status}"
+        ):
+            raise ValueError(f"Unknown game status: {status}")
 
         outcome = status
         if status == "mate":
@@ -133,6 +249,20 @@ class Game(threading.Thread):
         elif status == "stalemate":
             outcome = "draw"
 
-        response = generate_game_over_response(self.opponent_username, outcome)
+        response = generate_game_over_response(
+            self.opponent_username, outcome, self._rng
+        )
         self.client.bots.post_message(game_id, response)
         return response
+
+
+def move_budget_ms(time_ms: float, inc_ms: float) -> float:
+    """
+    Time to spend on a move: 1/MOVES_TO_GO of the clock plus the increment, but
+    never more than the clock left, minus MOVE_OVERHEAD_MS.
+
+    Args:
+        time_ms: Time left on our clock, in milliseconds
+        inc_ms: Increment per move, in milliseconds
+    """
+    return min(time_ms / MOVES_TO_GO + inc_ms, max(time_ms - MOVE_OVERHEAD_MS, 0))
@@ -1,3 +1,5 @@
+import logging
+import os
 import sys
 from pathlib import Path
 
@@ -9,5 +11,7 @@ if str(PROJECT_ROOT) not in sys.path:
 from lichess.bot import LichessBot
 
 if __name__ == "__main__":
+    # e.g. LOG_LEVEL=DEBUG to log every received event
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
     bot = LichessBot()
     bot.run()
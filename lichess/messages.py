@@ -1,4 +1,5 @@
-from random import choice as random_choice
+import re
+from random import Random, choice as random_choice
 
 SHORT_GREETING_1 = "Hi, I'm JackBot! By default, I play at medium difficulty."
 SHORT_GREETING_2 = "You can change my difficulty at any time by sending: 'easy', 'medium', or 'hard' in chat."
@@ -75,20 +76,65 @@ GAME_OVER_RESPONSES = {
 }
 
 
-def generate_chat_response(username: str, text: str) -> str:
-    """Generate a chat response as reply to user message."""
-    response_template = random_choice(CHAT_RESPONSES)
-    response = response_template.replace("{{username}}", username).replace(
-        "{{text}}", text
-    )
-    return response
+# Templates are converted once at import time from {{slot}} to str.format syntax,
+# so rendering a message is a single format_map pass instead of a str.replace per slot
+_SLOT_PATTERN = re.compile(r"\{\{(username|text)\}\}")
 
 
-def generate_game_over_response(username: str, result: str) -> str:
+class _SafeDict(dict):
+    """Renders unknown slots as empty strings instead of raising KeyError."""
+
+    def __missing__(self, key):
+        return ""
+
+
+def _to_format_template(template: str) -> str:
+    """Convert a {{slot}} template to str.format syntax, escaping literal braces."""
+    parts = _SLOT_PATTERN.split(template)
+    # Odd indices are slot names captured by the pattern, even ones are literal text
+    for i in range(0, len(parts), 2):
+        parts[i] = parts[i].replace("{", "{{").replace("}", "}}")
+    for i in range(1, len(parts), 2):
+        parts[i] = "{" + parts[i] + "}"
+    return "".join(parts)
+
+
+# (template, needs formatting): most greetings have no slots and are sent verbatim
+_FORMAT_GREETINGS = [
+    (_to_format_template(t), True) if _SLOT_PATTERN.search(t) else (t, False)
+    for t in GREETINGS
+]
+_FORMAT_CHAT = [_to_format_template(t) for t in CHAT_RESPONSES]
+_FORMAT_GAME_OVER = {
+    result: [_to_format_template(t) for t in templates]
+    for result, templates in GAME_OVER_RESPONSES.items()
+}
+
+
+def generate_greetings(username: str) -> list[str]:
+    """Generate the greeting messages sent at the start of a game."""
+    slots = _SafeDict(username=username)
+    return [
+        greeting.format_map(slots) if needs_format else greeting
+        for greeting, needs_format in _FORMAT_GREETINGS
+    ]
+
+
+def generate_chat_response(username: str, text: str, rng: Random | None = None) -> str:
+    """
+    Generate a chat response as reply to user message.
+    Pass a per-game `rng` to avoid sharing the module-level random instance across threads.
+    """
+    choice = rng.choice if rng is not None else random_choice
+    return choice(_FORMAT_CHAT).format_map(_SafeDict(username=username, text=text))
+
+
+def generate_game_over_response(
+    username: str, result: str, rng: Random | None = None
+) -> str:
     """Generate a response for game over based on result."""
-    responses = GAME_OVER_RESPONSES.get(result, [])
+    responses = _FORMAT_GAME_OVER.get(result, [])
     if not responses:
         return "Game over!"
-    response_template = random_choice(responses)
-    response = response_template.replace("{{username}}", username)
-    return response
+    choice = rng.choice if rng is not None else random_choice
+    return choice(responses).format_map(_SafeDict(username=username))
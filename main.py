@@ -4,7 +4,7 @@ Chess AI Engine - Main Entry Point
 This file demonstrates the basic functionality of the chess engine.
 """
 
-from src import Board
+from src import Board, Color
 from src.evaluate.evaluate import evaluate
 
 
@@ -30,8 +30,8 @@ def main():
     print()
 
     # Show piece counts
-    print(f"White pieces: {len(board.white_pieces)}")
-    print(f"Black pieces: {len(board.black_pieces)}")
+    print(f"White pieces: {len(board.get_pieces(Color.WHITE))}")
+    print(f"Black pieces: {len(board.get_pieces(Color.BLACK))}")
     print()
 
     # Test square notation conversion
@@ -46,13 +46,13 @@ def main():
 
     # Show all pieces with their positions
     print("White Pieces:")
-    for rank, file, piece in sorted(board.white_pieces):
+    for rank, file, piece in board.get_pieces(Color.WHITE):
         notation = board.square_to_notation(rank, file)
         print(f"  {piece.piece_type.name} at {notation}")
     print()
 
     print("Black Pieces:")
-    for rank, file, piece in sorted(board.black_pieces):
+    for rank, file, piece in board.get_pieces(Color.BLACK):
         notation = board.square_to_notation(rank, file)
         print(f"  {piece.piece_type.name} at {notation}")
     print()
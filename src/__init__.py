@@ -8,14 +8,20 @@ This package contains the core chess engine components:
 - move: Move representation
 """
 
+import importlib
 from src.core.constants import Color, PieceType, GameStatus
 from src.core.piece import Piece
 from src.core.board import Board
 from src.core.move import Move
 from src.core.movegen import MoveGenerator
-from src.agents.base import BaseAgent
-from src.agents.random import RandomAgent
-from src.agents.minimax import MinimaxAgent
+
+# Agents pull in the search and evaluation modules, so they are only imported
+# on first access (e.g. `from src import MinimaxAgent`), not by `import src`
+_LAZY_AGENTS = {
+    "BaseAgent": "src.agents.base",
+    "RandomAgent": "src.agents.random",
+    "MinimaxAgent": "src.agents.minimax",
+}
 
 __all__ = [
     "Color",
@@ -29,3 +35,13 @@ __all__ = [
     "RandomAgent",
     "MinimaxAgent",
 ]
+
+
+def __getattr__(name: str):
+    """Import agents lazily, see _LAZY_AGENTS."""
+    module_name = _LAZY_AGENTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    agent = getattr(importlib.import_module(module_name), name)
+    globals()[name] = agent  # Later lookups skip __getattr__
+    return agent
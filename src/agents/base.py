@@ -1,8 +1,18 @@
+import threading
 from abc import ABC, abstractmethod
 from typing import List, Optional
-from src import Board, Move, MoveGenerator
+from src.core.board import Board
+from src.core.constants import WHITE
+from src.core.move import Move
 from src.evaluate.evaluate import evaluate
-from .utils import evaluate_move
+from .utils import (
+    MAX_HISTORY_SCORE,
+    MAX_PLY,
+    NO_KILLER,
+    NO_KILLERS,
+    history_index,
+    sort_moves,
+)
 
 
 class BaseAgent(ABC):
@@ -13,7 +23,20 @@ class BaseAgent(ABC):
 
     def __init__(self, board: Board):
         self.board = board
-        self.move_generator = MoveGenerator(board)
+        self.move_generator = board.movegen
+
+        # Set by the caller (e.g. a time-control Timer) to ask the search to stop early
+        self.stop_event = threading.Event()
+        # Set by the caller to a time.monotonic() deadline after which the search
+        # should not start another iterative deepening iteration, if it does any
+        self.soft_deadline: Optional[float] = None
+        # Score of the last move returned by find_best_move, if the agent computes one,
+        # from the perspective of the side that was to move
+        self.best_value = 0
+        # History heuristic scores for quiet moves, indexed by history_index
+        self.history = [0] * (64 * 64)
+        # Killer moves (as history indices), two per ply from the search root
+        self.killers = [[NO_KILLER, NO_KILLER] for _ in range(MAX_PLY)]
 
     @abstractmethod
     def find_best_move(self, depth: int) -> Optional[Move]:
@@ -30,21 +53,57 @@ class BaseAgent(ABC):
 
     def evaluate_board(self) -> int:
         """
-        Evaluate the current board position.
+        Evaluate the current board position from the perspective of the side to move.
 
         Returns:
-            Evaluation score as an integer
+            Evaluation score as an integer, positive if the side to move is better
         """
         # Default implementation, can be overridden by subclasses
-        return evaluate(self.board)
+        score = evaluate(self.board)
+        return score if self.board.turn == WHITE else -score
 
-    def get_legal_moves(self) -> List[Move]:
+    def get_legal_moves(self, ply: Optional[int] = None) -> List[Move]:
         """
         Get a sorted list of legal moves for the current position.
 
+        Args:
+            ply: Distance from the search root, to order this ply's killer moves first
+
         Returns:
             List of legal Move objects, sorted by their evaluation score
         """
         legal_moves = self.move_generator.generate_legal_moves()
-        legal_moves.sort(key=evaluate_move, reverse=True)
-        return legal_moves
+        killers = self.killers[ply] if ply is not None and ply < MAX_PLY else NO_KILLERS
+        return sort_moves(legal_moves, self.board, self.history, killers)
+
+    def get_legal_captures(self) -> List[Move]:
+        """
+        Get a sorted list of legal captures for the current position.
+
+        Returns:
+            List of legal capturing Move objects, sorted by their evaluation score
+        """
+        captures = self.move_generator.generate_legal_captures()
+        return sort_moves(captures, self.board, self.history)
+
+    def record_cutoff(self, move: Move, depth: int, ply: int) -> None:
+        """
+        Reward a quiet move that caused a beta cutoff, so it is tried earlier
+        in sibling positions: as a killer at the same ply, and by history anywhere.
+        """
+        if move.captured_piece_type is not None or move.promotion_piece_type:
+            return
+        index = history_index(move)
+        self.history[index] = min(
+            self.history[index] + depth * depth, MAX_HISTORY_SCORE
+        )
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != index:
+                killers[1] = killers[0]
+                killers[0] = index
+
+    def clear_killers(self) -> None:
+        """Forget killer moves, whose plies are relative to the previous search root."""
+        for killers in self.killers:
+            killers[0] = killers[1] = NO_KILLER
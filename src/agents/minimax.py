@@ -1,24 +1,122 @@
-from typing import Callable
-from src.agents.base import *
-from src import Color
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from math import log
+from time import monotonic
+from typing import Dict, Iterator, List, Optional, Tuple
+from src.core.board import Board
+from src.core.move import Move
+from src.agents.base import BaseAgent
+from src.agents.utils import MAX_PLY, NO_KILLERS, sort_moves
+
+# Score sentinels (also used for checkmate). Evaluations are ints, so these are
+# ints too, beyond any reachable evaluation, to keep all comparisons int-only
+POS_INF = 1 << 30
+NEG_INF = -POS_INF
+
+# Transposition table entry flags: how the stored value bounds the true score
+EXACT, LOWER_BOUND, UPPER_BOUND = 0, 1, 2
+# Transposition table slots (a power of two), in buckets of adjacent slots that
+# a position may be stored in: a new entry takes the slot of the same position,
+# else the first empty slot, else the slot of the shallowest search
+TRANSPOSITION_TABLE_SIZE = 1 << 20
+TRANSPOSITION_BUCKET_SIZE = 4
+TRANSPOSITION_TABLE_MASK = (TRANSPOSITION_TABLE_SIZE - 1) & ~(
+    TRANSPOSITION_BUCKET_SIZE - 1
+)
+
+# Null-move pruning: extra depth reduction of the null-move search, and the
+# minimum remaining depth at which it is tried
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_MIN_DEPTH = 3
+
+# Late move reductions: quiet moves from this index on in the move order, at
+# this remaining depth or more, are first searched to a reduced depth
+LATE_MOVE_MIN_INDEX = 4
+LATE_MOVE_MIN_DEPTH = 3
+
+# Aspiration windows: from this iteration on, the root is first searched within
+# this margin of the previous iteration's value (a pawn in evaluate units),
+# widened by this factor once before falling back to a full window
+ASPIRATION_MIN_DEPTH = 4
+ASPIRATION_WINDOW = 1000
+ASPIRATION_WIDENING = 4
+
+# Root moves are only searched in worker processes from this depth on, shallower
+# iterations finish faster than the moves take to send over
+PARALLEL_MIN_DEPTH = 3
+# How often (in seconds) to check the stop event while waiting on worker processes
+PARALLEL_POLL_INTERVAL = 0.05
 
 
 class MinimaxAgent(BaseAgent):
     """
     Chess agent using minimax with alpha-beta pruning and quiescence search.
+    The search is written in negamax form: every score is from the perspective of
+    the side to move, so one recursion serves both players.
 
     References:
     - [VIDEO] https://youtu.be/l-hh51ncgDI?si=HEflzJDShZmo8rN-
+    - Negamax: https://www.chessprogramming.org/Negamax
     - Alpha-beta pruning to optimize search: https://www.chessprogramming.org/Alpha-Beta
+    - Principal variation search: https://www.chessprogramming.org/Principal_Variation_Search
     - Quiescence search to avoid horizon effect: https://www.chessprogramming.org/Quiescence_Search
+    - Transposition table: https://www.chessprogramming.org/Transposition_Table
+    - Killer heuristic: https://www.chessprogramming.org/Killer_Heuristic
+    - Null move pruning: https://www.chessprogramming.org/Null_Move_Pruning
+    - Late move reductions: https://www.chessprogramming.org/Late_Move_Reductions
+    - Iterative deepening: https://www.chessprogramming.org/Iterative_Deepening
+    - Aspiration windows: https://www.chessprogramming.org/Aspiration_Windows
     """
 
-    def __init__(self, board: Board):
+    def __init__(self, board: Board, processes: int = 1):
+        """
+        Args:
+            board: The board to search, shared with the caller
+            processes: Worker processes to search root moves in parallel, 1 to
+                search everything in this process
+        """
         super().__init__(board)
+        self.process_pool = None
+        if processes > 1:
+            # Set while the workers should stop searching, as stop_event is here
+            self.worker_stop_event = multiprocessing.Event()
+            self.process_pool = ProcessPoolExecutor(
+                processes,
+                initializer=_init_worker,
+                initargs=(self.worker_stop_event,),
+            )
+        # Positions visited by the last find_best_move call (search + quiescence)
+        self.nodes_searched = 0
+        # Fixed-size table of (hash_key, depth, value, flag, best_move) or None,
+        # indexed by the low bits of Board.hash_key
+        self.transposition_table: List[
+            Optional[Tuple[int, int, int, int, Optional[Move]]]
+        ] = [None] * TRANSPOSITION_TABLE_SIZE
+        # Per-search memos of position-only facts, keyed by Board.hash_key: whether
+        # the side to move is in check, whether material is insufficient, and the
+        # evaluation of positions that are not a technical draw
+        self._check_cache: Dict[int, bool] = {}
+        self._insufficient_material_cache: Dict[int, bool] = {}
+        self._evaluation_cache: Dict[int, int] = {}
+
+    def close(self) -> None:
+        """Stop the worker processes, if any. The agent searches in-process after."""
+        if self.process_pool is not None:
+            self.worker_stop_event.set()
+            self.process_pool.shutdown(cancel_futures=True)
+            self.process_pool = None
+
+    def __enter__(self) -> "MinimaxAgent":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
     def find_best_move(self, depth: int) -> Optional[Move]:
         """
-        Find the best move for the current position.
+        Find the best move for the current position, with iterative deepening:
+        search depth 1, 2, ... up to `depth`, trying the previous iteration's
+        best move first each time, in a window around its value.
 
         Args:
             depth: The search depth
@@ -26,10 +124,6 @@ class MinimaxAgent(BaseAgent):
         Returns:
             The best move, or None if no legal moves (checkmate/stalemate)
         """
-        best_move = None
-        alpha = float("-inf")
-        beta = float("inf")
-
         legal_moves = self.get_legal_moves()
 
         # Base case: no legal moves (checkmate or stalemate)
@@ -40,102 +134,380 @@ class MinimaxAgent(BaseAgent):
         if self.board.is_technical_draw():
             return None
 
-        # Maximize if white, minimize if black
-        is_maximizing = self.board.turn == Color.WHITE
+        self.nodes_searched = 0
+        self.clear_killers()
+        self._check_cache.clear()
+        self._insufficient_material_cache.clear()
+        self._evaluation_cache.clear()
+        best_move = None
+        best_value = 0
+        for current_depth in range(1, depth + 1):
+            window = (
+                ASPIRATION_WINDOW if current_depth >= ASPIRATION_MIN_DEPTH else None
+            )
+            while True:
+                if window is None:
+                    alpha, beta = NEG_INF, POS_INF
+                else:
+                    alpha, beta = best_value - window, best_value + window
+                move, value = self._root_search(
+                    current_depth, legal_moves, best_move, alpha, beta
+                )
+                if self.stop_event.is_set() or window is None or alpha < value < beta:
+                    break
+                # The value fell outside the window: widen it once, then give up
+                # on aspiration and search the full window
+                if window == ASPIRATION_WINDOW:
+                    window *= ASPIRATION_WIDENING
+                else:
+                    window = None
+
+            if self.stop_event.is_set() and best_move is not None:
+                break  # Interrupted iteration, keep the previous (complete) result
+            best_move, best_value = move, value
+
+            if abs(best_value) == POS_INF:
+                break  # Found a forced mate, no need to search deeper
+
+            if self.soft_deadline is not None and monotonic() >= self.soft_deadline:
+                break  # Next iteration would likely not finish in time
+
+        self.best_value = best_value
+        return best_move
+
+    def _root_search(
+        self,
+        depth: int,
+        legal_moves: List[Move],
+        pv_move: Optional[Move],
+        alpha: int = NEG_INF,
+        beta: int = POS_INF,
+    ) -> Tuple[Optional[Move], int]:
+        """
+        Search each root move to the given depth.
+
+        Args:
+            depth: The search depth
+            legal_moves: Legal moves of the root position, in search order
+            pv_move: Best move of the previous iteration, searched first
+            alpha: Lower bound of the search window
+            beta: Upper bound of the search window
 
-        if is_maximizing:
-            best_value = float("-inf")
-            for move in legal_moves:
-                self.board.make_move(move)
-                value = self._minimax(depth - 1, alpha, beta, False)
-                self.board.unmake_move()
+        Returns:
+            (best move, its value from the side to move's perspective). A value at
+            or outside the window only bounds the true value
+        """
+        if pv_move is not None:
+            # Swap the PV move to the front of a copy, the caller reuses its list
+            index = legal_moves.index(pv_move)
+            legal_moves = legal_moves[:]
+            legal_moves[0], legal_moves[index] = legal_moves[index], legal_moves[0]
 
-                if value >= best_value:
-                    best_value = value
-                    best_move = move
+        if self.process_pool is not None and depth >= PARALLEL_MIN_DEPTH:
+            return self._parallel_root_search(depth, legal_moves, alpha, beta)
 
-                alpha = max(alpha, value)
-        else:
-            best_value = float("inf")
-            for move in legal_moves:
-                self.board.make_move(move)
-                value = self._minimax(depth - 1, alpha, beta, True)
-                self.board.unmake_move()
+        # Bind hot methods once, outside the move loop
+        make_move = self.board.make_move
+        unmake_move = self.board.unmake_move
+        negamax = self._negamax
+        stop_event_is_set = self.stop_event.is_set
 
-                if value <= best_value:
-                    best_value = value
-                    best_move = move
+        best_move = None
+        best_value = NEG_INF
+        for move_index, move in enumerate(legal_moves):
+            make_move(move)
+            if move_index == 0:
+                value = -negamax(depth - 1, -beta, -alpha, 1)
+            else:
+                # Principal variation search, as in _negamax
+                value = -negamax(depth - 1, -alpha - 1, -alpha, 1)
+                if alpha < value < beta:
+                    value = -negamax(depth - 1, -beta, -alpha, 1)
+            unmake_move()
+
+            # Strictly better only: once alpha is raised, later moves fail low and
+            # return exactly alpha, which must not displace the move that set it
+            if best_move is None or value > best_value:
+                best_value = value
+                best_move = move
+            if value > alpha:
+                alpha = value
+                if alpha >= beta:
+                    break  # Failed high, the caller widens the window
 
-                beta = min(beta, value)
+            if stop_event_is_set():
+                break  # Out of time, caller decides whether to trust this result
 
-        return best_move
+        return best_move, best_value
 
-    def _minimax(
-        self, depth: int, alpha: float, beta: float, is_maximizing: bool
-    ) -> float:
+    def _parallel_root_search(
+        self, depth: int, legal_moves: List[Move], alpha: int, beta: int
+    ) -> Tuple[Optional[Move], int]:
         """
-        Minimax algorithm with alpha-beta pruning.
+        _root_search across worker processes: the first move is searched here to
+        set alpha, then every other move in its own process with that alpha, which
+        can no longer be raised in between (Young Brothers Wait).
+        Each worker process keeps one agent, and so its transposition table,
+        across searches (see _init_worker). Once stop_event is set, the workers
+        are stopped too and waited for, so none outlive this call.
+
+        Args and return value as in _root_search
+        """
+        board = self.board
+        first_move = legal_moves[0]
+        board.make_move(first_move)
+        best_value = -self._negamax(depth - 1, -beta, -alpha, 1)
+        board.unmake_move()
+        best_move = first_move
+        if best_value > alpha:
+            alpha = best_value
+        if alpha >= beta or len(legal_moves) == 1 or self.stop_event.is_set():
+            return best_move, best_value
+
+        # Each worker gets its own pickled copy of the board
+        pending = {
+            self.process_pool.submit(
+                _search_root_move, board, move, depth, alpha, beta
+            ): move
+            for move in legal_moves[1:]
+        }
+        values = {}
+        while pending:
+            done, _ = wait(
+                pending, timeout=PARALLEL_POLL_INTERVAL, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                move = pending.pop(future)
+                values[move], nodes_searched = future.result()
+                self.nodes_searched += nodes_searched
+            if self.stop_event.is_set():
+                # Out of time, caller decides whether to trust this result. Running
+                # workers unwind within a node of the stop, their values are dropped
+                self.worker_stop_event.set()
+                for future in pending:
+                    future.cancel()
+                wait(pending)
+                self.worker_stop_event.clear()
+                break
+
+        # Strictly better only, in move order, as in _root_search
+        for move in legal_moves[1:]:
+            value = values.get(move)
+            if value is not None and value > best_value:
+                best_value = value
+                best_move = move
+        return best_move, best_value
+
+    def _negamax(
+        self,
+        depth: int,
+        alpha: int,
+        beta: int,
+        ply: int,
+        allow_null_move: bool = True,
+    ) -> int:
+        """
+        Negamax algorithm with alpha-beta pruning.
 
         Args:
             depth: Remaining search depth
             alpha: Alpha value for pruning
             beta: Beta value for pruning
-            is_maximizing: True if maximizing player, False if minimizing
+            ply: Distance from the search root
+            allow_null_move: False right after a null move, so two never follow
 
         Returns:
-            The evaluation score for this position
+            The evaluation score for this position, from the side to move's perspective
         """
+        # Out of time: unwind quickly, the result of this iteration gets discarded
+        if self.stop_event.is_set():
+            return 0
+
+        self.nodes_searched += 1
 
         # Base case: reached depth limit
         if depth <= 0:
-            return self._quiescence_search(alpha, beta, is_maximizing)
+            return self._quiescence_search(alpha, beta)
 
-        # Base case: check for game over
-        # 1. Technical draw
-        if self.board.is_technical_draw():
-            return 0
-        # 2. No legal moves
-        legal_moves = self.get_legal_moves()
-        if not legal_moves:
-            if self.board.is_in_check(self.board.turn):
-                # Checkmate (-inf for black win, +inf for white win)
-                return float("-inf") if is_maximizing else float("inf")
-            else:
-                # Stalemate
-                return 0
+        board = self.board
 
-        if is_maximizing:
-            max_eval = float("-inf")
-            for move in legal_moves:
-                self.board.make_move(move)
-                eval_score = self._minimax(depth - 1, alpha, beta, False)
-                self.board.unmake_move()
-
-                max_eval = max(max_eval, eval_score)
-                alpha = max(alpha, eval_score)
+        # Base case: technical draw (checkmate and stalemate are found by the move
+        # loop running out of legal moves)
+        if self._is_technical_draw():
+            return 0
 
+        # Reuse what an earlier search found for this position
+        hash_key = board.hash_key
+        transposition_table = self.transposition_table
+        index = hash_key & TRANSPOSITION_TABLE_MASK
+        entry = None
+        # Buckets fill up front to back and slots are never emptied, so the
+        # first empty slot ends the probe
+        for slot in range(index, index + TRANSPOSITION_BUCKET_SIZE):
+            candidate = transposition_table[slot]
+            if candidate is None:
+                break
+            if candidate[0] == hash_key:
+                entry = candidate
+                break
+        tt_move = None
+        if entry is not None:
+            _, entry_depth, entry_value, entry_flag, tt_move = entry
+            if entry_depth >= depth:
+                if entry_flag == EXACT:
+                    return entry_value
+                if entry_flag == LOWER_BOUND:
+                    alpha = max(alpha, entry_value)
+                else:
+                    beta = min(beta, entry_value)
                 if alpha >= beta:
-                    break  # Beta cutoff
+                    return entry_value
+        original_alpha = alpha
+
+        # Null move: if passing the turn still fails high on a reduced search,
+        # a real move almost surely would too. Unsound in zugzwang, so skipped
+        # when in check or when only pawns are left to move. Only tried at non-PV
+        # nodes (zero windows), where an exact score is not needed
+        if (
+            allow_null_move
+            and beta - alpha == 1
+            and depth >= NULL_MOVE_MIN_DEPTH
+            and board.has_non_pawn_material(board.turn)
+            and not self._is_in_check()
+        ):
+            en_passant_square = board.make_null_move()
+            score = -self._negamax(
+                depth - 1 - NULL_MOVE_REDUCTION, -beta, -beta + 1, ply + 1, False
+            )
+            board.unmake_null_move(en_passant_square)
+            if score >= beta:
+                return beta
 
-            return max_eval
-        else:
-            min_eval = float("inf")
-            for move in legal_moves:
-                self.board.make_move(move)
-                eval_score = self._minimax(depth - 1, alpha, beta, True)
-                self.board.unmake_move()
+        # Bind hot methods once, outside the move loop
+        make_move = board.make_move
+        unmake_move = board.unmake_move
+        is_in_check = board.is_in_check
+        negamax = self._negamax
 
-                min_eval = min(min_eval, eval_score)
-                beta = min(beta, eval_score)
+        # Late quiet moves are unlikely to be best when moves are well ordered
+        can_reduce = depth >= LATE_MOVE_MIN_DEPTH and not self._is_in_check()
 
-                if alpha >= beta:
-                    break  # Alpha cutoff
+        color = board.turn
+        move_index = 0  # Legal moves searched so far
+        best_move = None
+        best_value = NEG_INF
+        for move in self._staged_moves(tt_move, ply):
+            # Moves are only checked for legality once made
+            make_move(move)
+            if is_in_check(color):
+                unmake_move()
+                continue  # Illegal, leaves our king in check
+            if move_index == 0:
+                score = -negamax(depth - 1, -beta, -alpha, ply + 1)
+            else:
+                reduction = 0
+                if (
+                    can_reduce
+                    and move_index >= LATE_MOVE_MIN_INDEX
+                    and move.captured_piece_type is None
+                    and move.promotion_piece_type is None
+                ):
+                    reduction = 1 + int(log(depth) * log(move_index) / 2)
+                    score = -negamax(
+                        max(depth - 1 - reduction, 1), -alpha - 1, -alpha, ply + 1
+                    )
+                if not reduction or score > alpha:
+                    # Principal variation search: only prove this move is no better
+                    # than alpha, and search it fully if that fails
+                    score = -negamax(depth - 1, -alpha - 1, -alpha, ply + 1)
+                    if alpha < score < beta:
+                        score = -negamax(depth - 1, -beta, -alpha, ply + 1)
+            unmake_move()
+            move_index += 1
+
+            if score > best_value:
+                best_value = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self.record_cutoff(move, depth, ply)
+                        break  # Beta cutoff
+
+        # No legal moves
+        if move_index == 0:
+            if self._is_in_check():
+                # Checkmate, the side to move lost
+                return NEG_INF
+            else:
+                # Stalemate
+                return 0
 
-            return min_eval
+        # Don't store results of an interrupted search
+        if not self.stop_event.is_set():
+            if best_value <= original_alpha:
+                flag = UPPER_BOUND
+            elif best_value >= beta:
+                flag = LOWER_BOUND
+            else:
+                flag = EXACT
+            replaced = index
+            for slot in range(index, index + TRANSPOSITION_BUCKET_SIZE):
+                candidate = transposition_table[slot]
+                if candidate is None or candidate[0] == hash_key:
+                    replaced = slot
+                    break
+                if candidate[1] < transposition_table[replaced][1]:
+                    replaced = slot
+            transposition_table[replaced] = (
+                hash_key,
+                depth,
+                best_value,
+                flag,
+                best_move,
+            )
+
+        return best_value
+
+    def _staged_moves(self, tt_move: Optional[Move], ply: int) -> Iterator[Move]:
+        """
+        Pseudo-legal moves of the current position in search order, generated in
+        stages so that a beta cutoff skips the later ones:
+        1. The transposition table move
+        2. Captures, by MVV-LVA
+        3. Other moves: promotions, killer moves, then the rest by history
 
-    def _quiescence_search(
-        self, alpha: float, beta: float, is_maximizing: bool, max_depth: int = 4
-    ) -> float:
+        Args:
+            tt_move: Best move stored for this position, if any. Its stored hash
+                key is verified, so it is a move of this position
+            ply: Distance from the search root, for its killer moves
+        """
+        board = self.board
+        move_generator = self.move_generator
+        history = self.history
+
+        # Keys are compared instead of moves, to skip Move.__eq__ calls
+        tt_key = -1
+        if tt_move is not None:
+            tt_key = tt_move.key
+            yield tt_move
+
+        captures = move_generator.generate_pseudo_legal_captures()
+        for move in sort_moves(captures, board, history):
+            if move.key != tt_key:
+                yield move
+
+        quiet_moves = [
+            move
+            for move in move_generator.generate_pseudo_legal_moves()
+            if move.captured_piece_type is None
+        ]
+        killers = self.killers[ply] if ply < MAX_PLY else NO_KILLERS
+        for move in sort_moves(quiet_moves, board, history, killers):
+            if move.key != tt_key:
+                yield move
+
+    def _quiescence_search(self, alpha: int, beta: int, max_depth: int = 4) -> int:
         """
         Quiescence search to avoid horizon effect.
         Only searches capture moves to stabilize the position.
@@ -143,70 +515,138 @@ class MinimaxAgent(BaseAgent):
         Args:
             alpha: Alpha value for pruning
             beta: Beta value for pruning
-            is_maximizing: True if maximizing player
             max_depth: Maximum quiescence depth
 
         Returns:
-            The evaluation score
+            The evaluation score, from the side to move's perspective
         """
-        cur_eval = self.evaluate_board()
-
-        if max_depth <= 0:
-            return cur_eval
+        self.nodes_searched += 1
+        board = self.board
 
         # Base case: technical draw
-        if self.board.is_technical_draw():
+        if self._is_technical_draw():
             return 0
 
+        if max_depth <= 0:
+            return self._evaluate_position()
+
         # Base case: no legal moves (checkmate or stalemate)
-        legal_moves = self.get_legal_moves()
-        if not legal_moves:
-            if self.board.is_in_check(self.board.turn):
-                # Checkmate (-inf for black win, +inf for white win)
-                return float("-inf") if is_maximizing else float("inf")
+        if not self.move_generator.has_legal_move():
+            if self._is_in_check():
+                # Checkmate, the side to move lost
+                return NEG_INF
             else:
                 # Stalemate
                 return 0
 
-        if is_maximizing:
-            if cur_eval >= beta:
+        # Only evaluate positions that are still in play
+        cur_eval = self._evaluate_position()
+        if cur_eval >= beta:
+            return beta
+        if cur_eval > alpha:
+            alpha = cur_eval
+
+        # Bind hot methods once, outside the move loop
+        make_move = board.make_move
+        unmake_move = board.unmake_move
+        is_in_check = board.is_in_check
+        quiescence_search = self._quiescence_search
+
+        # Captures are only checked for legality once made, so the ones after
+        # a beta cutoff are never made at all
+        color = board.turn
+        captures = self.move_generator.generate_pseudo_legal_captures()
+        for move in sort_moves(captures, board, self.history):
+            make_move(move)
+            if is_in_check(color):
+                unmake_move()
+                continue  # Illegal, leaves our king in check
+            score = -quiescence_search(-beta, -alpha, max_depth - 1)
+            unmake_move()
+
+            if score >= beta:
                 return beta
-            alpha = max(alpha, cur_eval)
-
-            captures = [
-                move
-                for move in self.get_legal_moves()
-                if move.captured_piece_type is not None
-            ]
-
-            for move in captures:
-                self.board.make_move(move)
-                score = self._quiescence_search(alpha, beta, False, max_depth - 1)
-                self.board.unmake_move()
-
-                if score >= beta:
-                    return beta
-                alpha = max(alpha, score)
-
-            return alpha
-        else:
-            if cur_eval <= alpha:
-                return alpha
-            beta = min(beta, cur_eval)
-
-            captures = [
-                move
-                for move in self.get_legal_moves()
-                if move.captured_piece_type is not None
-            ]
-
-            for move in captures:
-                self.board.make_move(move)
-                score = self._quiescence_search(alpha, beta, True, max_depth - 1)
-                self.board.unmake_move()
-
-                if score <= alpha:
-                    return alpha
-                beta = min(beta, score)
+            if score > alpha:
+                alpha = score
 
-            return beta
+        return alpha
+
+    def _is_in_check(self) -> bool:
+        """Board.is_in_check for the side to move, memoized per position."""
+        board = self.board
+        hash_key = board.hash_key
+        in_check = self._check_cache.get(hash_key)
+        if in_check is None:
+            in_check = self._check_cache[hash_key] = board.is_in_check(board.turn)
+        return in_check
+
+    def _evaluate_position(self) -> int:
+        """
+        evaluate_board, memoized per position. Only for positions that are not a
+        technical draw, evaluate's own draw check depends on the game history.
+        """
+        hash_key = self.board.hash_key
+        evaluation = self._evaluation_cache.get(hash_key)
+        if evaluation is None:
+            evaluation = self._evaluation_cache[hash_key] = self.evaluate_board()
+        return evaluation
+
+    def _is_technical_draw(self) -> bool:
+        """
+        Board.is_technical_draw, with the insufficient material part memoized per
+        position. The 50-move rule and repetitions depend on the game history,
+        not just the position, so they are always checked.
+        """
+        board = self.board
+        if board.halfmove_clock >= 100 or board.is_threefold_repetition():
+            return True
+        hash_key = board.hash_key
+        is_draw = self._insufficient_material_cache.get(hash_key)
+        if is_draw is None:
+            is_draw = self._insufficient_material_cache[hash_key] = (
+                board.is_insufficient_material()
+            )
+        return is_draw
+
+
+# The agent of a worker process, created by _init_worker
+_worker_agent: Optional[MinimaxAgent] = None
+
+
+def _init_worker(stop_event) -> None:
+    """
+    Create the agent of a worker process. It searches on its own board and stops
+    when the parent agent sets stop_event (its worker_stop_event).
+    """
+    global _worker_agent
+    _worker_agent = MinimaxAgent(Board())
+    _worker_agent.stop_event = stop_event
+
+
+def _search_root_move(
+    board: Board, move: Move, depth: int, alpha: int, beta: int
+) -> Tuple[int, int]:
+    """
+    Search one root move in a worker process, with principal variation search as
+    in MinimaxAgent._root_search.
+
+    Returns:
+        (value of the move from the root side to move's perspective, nodes searched)
+    """
+    agent = _worker_agent
+    if agent.board.hash_key != board.hash_key:
+        # A new root: start its search afresh, as find_best_move does. The
+        # transposition table is kept, its entries stay valid
+        agent.clear_killers()
+        agent._check_cache.clear()
+        agent._insufficient_material_cache.clear()
+        agent._evaluation_cache.clear()
+    agent.board._copy_position(board)
+    agent.nodes_searched = 0
+
+    agent.board.make_move(move)
+    value = -agent._negamax(depth - 1, -alpha - 1, -alpha, 1)
+    if alpha < value < beta:
+        value = -agent._negamax(depth - 1, -beta, -alpha, 1)
+    agent.board.unmake_move()
+    return value, agent.nodes_searched
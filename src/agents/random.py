@@ -1,4 +1,6 @@
-from src.agents.base import *
+from typing import Optional
+from src.core.move import Move
+from src.agents.base import BaseAgent
 from random import choice as random_choice
 
 
@@ -1,24 +1,93 @@
-from src import Move
+from typing import List, Sequence
+from src.core.board import Board
+from src.core.constants import PIECE_VALUES
+from src.core.move import MOVE_SQUARES_MASK, Move
 
+# Captures and promotions are always searched before quiet moves
+TACTICAL_MOVE_BONUS = 1_000_000
+# Killer moves are the quiet moves searched first, newest killer before the older one
+KILLER_MOVE_SCORE = TACTICAL_MOVE_BONUS - 1
+# History scores are clamped so quiet moves never outrank killers or tactical moves
+MAX_HISTORY_SCORE = KILLER_MOVE_SCORE - 2
+# Deepest ply with its own killer slots
+MAX_PLY = 64
+# Killer slots hold history indices, NO_KILLER when empty
+NO_KILLER = -1
+NO_KILLERS = (NO_KILLER, NO_KILLER)
 
-def evaluate_move(move: Move) -> int:
+
+def score_moves(
+    moves: List[Move],
+    board: Board,
+    history: List[int],
+    killers: Sequence[int] = NO_KILLERS,
+) -> List[int]:
     """
-    Move evaluation for move ordering.
+    Move evaluation for move ordering, scoring all moves in one pass.
     Purpose: Alpha-Beta pruning is more effective when better moves are searched first,
     as it increases the chances of pruning branches early.
+
+    Captures are ordered by MVV-LVA (most valuable victim, least valuable attacker),
+    quiet moves by the killer heuristic (`killers` holds the history indices of the
+    two latest quiet cutoff moves at this ply), then by the history heuristic.
+
+    References:
+    - MVV-LVA: https://www.chessprogramming.org/MVV-LVA
+    - Killer heuristic: https://www.chessprogramming.org/Killer_Heuristic
+    - History heuristic: https://www.chessprogramming.org/History_Heuristic
     """
-    score = 0
+    get_piece = board.get_piece
+    first_killer, second_killer = killers
+    scores = []
+    for move in moves:
+        captured_piece_type = move.captured_piece_type
+        promotion_piece_type = move.promotion_piece_type
+
+        if captured_piece_type is None and promotion_piece_type is None:
+            # Quiet move: killers first, then by how often it caused a cutoff
+            # elsewhere in the tree (index inlined from history_index)
+            index = move.key & MOVE_SQUARES_MASK
+            if index == first_killer:
+                score = KILLER_MOVE_SCORE
+            elif index == second_killer:
+                score = KILLER_MOVE_SCORE - 1
+            else:
+                score = history[index]
+        else:
+            score = 0
+            # Prioritize captures, most valuable victim first, then least valuable attacker
+            if captured_piece_type is not None:
+                attacker = get_piece(move.from_rank, move.from_file)
+                score += TACTICAL_MOVE_BONUS
+                score += PIECE_VALUES[captured_piece_type] * 10 - attacker.id
+            # Prioritize promotions
+            if promotion_piece_type is not None:
+                score += TACTICAL_MOVE_BONUS
+                score += PIECE_VALUES[promotion_piece_type] * 20
 
-    # Prioritize captures
-    if move.captured_piece_type is not None:
-        score += move.captured_piece_type.centipawn_value * 10
+        # Prioritize castling
+        if move.is_castling:
+            score += 5
 
-    # Prioritize promotions
-    if move.promotion_piece_type is not None:
-        score += move.promotion_piece_type.centipawn_value * 20
+        scores.append(score)
+    return scores
+
+
+def sort_moves(
+    moves: List[Move],
+    board: Board,
+    history: List[int],
+    killers: Sequence[int] = NO_KILLERS,
+) -> List[Move]:
+    """
+    Sort moves best first by score_moves, keeping generation order among ties.
+    Each move is scored exactly once, then only the int scores are compared.
+    """
+    scores = score_moves(moves, board, history, killers)
+    order = sorted(range(len(moves)), key=scores.__getitem__, reverse=True)
+    return [moves[i] for i in order]
 
-    # Prioritize castling
-    if move.is_castling:
-        score += 5
 
-    return score
+def history_index(move: Move) -> int:
+    """Index of a move in the from-square x to-square history table."""
+    return move.key & MOVE_SQUARES_MASK
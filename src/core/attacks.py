@@ -0,0 +1,222 @@
+"""
+Precomputed attack tables for the chess engine.
+
+Built once at import time and indexed by square = rank * 8 + file:
+- KNIGHT_/KING_/PAWN_ATTACKS: bitboards of the squares a piece attacks
+- *_RAY_MASKS: bitboards of slider rays, for sliding_attacks
+- BETWEEN: squares between two squares on a line, for checks and pins
+- BISHOP_/ROOK_ATTACKS: slider attacks looked up by masked occupancy, for both
+  move generation and attack detection
+
+References:
+- Attack tables: https://www.chessprogramming.org/Attack_and_Defend_Maps
+- Sliding attacks: https://www.chessprogramming.org/Classical_Approach
+- Slider lookups: https://www.chessprogramming.org/Magic_Bitboards
+"""
+
+from typing import Iterable, Tuple
+
+# Bitboard masks of files and ranks, for shifting whole bitboards (e.g. pawns)
+FULL_BOARD = (1 << 64) - 1
+NOT_FILE_A = ~0x0101010101010101
+NOT_FILE_H = ~0x8080808080808080
+NOT_FILE_AB = ~0x0303030303030303
+NOT_FILE_GH = ~0xC0C0C0C0C0C0C0C0
+RANK_1 = 0xFF
+RANK_3 = 0xFF << 16
+RANK_6 = 0xFF << 40
+RANK_8 = 0xFF << 56
+# Dark squares (a1, c1, ..., b2, ...), where rank + file is even
+DARK_SQUARES = 0xAA55AA55AA55AA55
+
+# Knight moves: 2 squares in one direction, 1 in perpendicular. As (square shift,
+# mask of the squares it can land on): a shift that moves right can't land on
+# the leftmost file(s), which it would only reach by wrapping around the board
+KNIGHT_SHIFTS = (
+    (17, NOT_FILE_A),
+    (15, NOT_FILE_H),
+    (10, NOT_FILE_AB),
+    (6, NOT_FILE_GH),
+    (-6, NOT_FILE_AB),
+    (-10, NOT_FILE_GH),
+    (-15, NOT_FILE_A),
+    (-17, NOT_FILE_H),
+)
+
+# (rank_delta, file_delta) directions for sliding pieces
+BISHOP_DIRECTIONS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+ROOK_DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+
+# King moves one square in any direction, as (square shift, landing mask)
+KING_SHIFTS = (
+    (9, NOT_FILE_A),
+    (8, FULL_BOARD),
+    (7, NOT_FILE_H),
+    (1, NOT_FILE_A),
+    (-1, NOT_FILE_H),
+    (-7, NOT_FILE_A),
+    (-8, FULL_BOARD),
+    (-9, NOT_FILE_H),
+)
+
+# Pawn captures of each color, as (square shift, landing mask)
+PAWN_SHIFTS = (
+    ((7, NOT_FILE_H), (9, NOT_FILE_A)),
+    ((-9, NOT_FILE_H), (-7, NOT_FILE_A)),
+)
+
+
+def _to_bitboard(squares: Iterable[Tuple[int, int]]) -> int:
+    """Bitboard with the given (rank, file) squares set."""
+    bitboard = 0
+    for rank, file in squares:
+        bitboard |= 1 << (rank * 8 + file)
+    return bitboard
+
+
+def _shift_attacks(shifts: Tuple[Tuple[int, int], ...]) -> Tuple:
+    """
+    For each square, the bitboard of squares its bit lands on after each shift,
+    as in https://www.chessprogramming.org/General_Setwise_Operations#Shifting_Bitboards
+    """
+    attacks = []
+    for square in range(64):
+        square_bit = 1 << square
+        bitboard = 0
+        for shift, mask in shifts:
+            if shift > 0:
+                bitboard |= (square_bit << shift) & mask & FULL_BOARD
+            else:
+                bitboard |= (square_bit >> -shift) & mask
+        attacks.append(bitboard)
+    return tuple(attacks)
+
+
+def _ray(rank: int, file: int, direction: Tuple[int, int]) -> Tuple:
+    """Squares from (rank, file) to the edge of the board, nearest first."""
+    dr, df = direction
+    squares = []
+    rank, file = rank + dr, file + df
+    while 0 <= rank < 8 and 0 <= file < 8:
+        squares.append((rank, file))
+        rank, file = rank + dr, file + df
+    return tuple(squares)
+
+
+def _ray_masks(directions: Tuple[Tuple[int, int], ...]) -> Tuple:
+    """
+    For each direction, (ray bitboard per square, whether the ray runs towards
+    higher squares), as used by sliding_attacks.
+    """
+    return tuple(
+        (
+            tuple(
+                _to_bitboard(_ray(rank, file, direction))
+                for rank in range(8)
+                for file in range(8)
+            ),
+            direction[0] * 8 + direction[1] > 0,
+        )
+        for direction in directions
+    )
+
+
+def _between() -> Tuple:
+    """
+    For each pair of squares, the bitboard of the squares strictly between them
+    if they share a rank, file or diagonal, else 0.
+    """
+    between = [[0] * 64 for _ in range(64)]
+    for rank in range(8):
+        for file in range(8):
+            for direction in BISHOP_DIRECTIONS + ROOK_DIRECTIONS:
+                squares_between = 0
+                for ray_rank, ray_file in _ray(rank, file, direction):
+                    square = ray_rank * 8 + ray_file
+                    between[rank * 8 + file][square] = squares_between
+                    squares_between |= 1 << square
+    return tuple(tuple(row) for row in between)
+
+
+KNIGHT_ATTACKS = _shift_attacks(KNIGHT_SHIFTS)
+KING_ATTACKS = _shift_attacks(KING_SHIFTS)
+# Squares attacked by a pawn on each square, indexed by [Color][square]
+PAWN_ATTACKS = tuple(_shift_attacks(shifts) for shifts in PAWN_SHIFTS)
+
+# Squares strictly between two squares on a line, indexed by [square][square]
+BETWEEN = _between()
+
+BISHOP_RAY_MASKS = _ray_masks(BISHOP_DIRECTIONS)
+ROOK_RAY_MASKS = _ray_masks(ROOK_DIRECTIONS)
+
+
+def sliding_attacks(square: int, occupied: int, ray_masks: Tuple) -> int:
+    """
+    Bitboard of squares a slider on `square` attacks, given the occupied squares:
+    each ray up to and including its first blocker.
+
+    Args:
+        square: The slider's square (rank * 8 + file)
+        occupied: Bitboard of all pieces
+        ray_masks: BISHOP_RAY_MASKS or ROOK_RAY_MASKS
+    """
+    attacks = 0
+    for masks, towards_higher_squares in ray_masks:
+        ray = masks[square]
+        blockers = ray & occupied
+        if blockers:
+            if towards_higher_squares:
+                blocker = (blockers & -blockers).bit_length() - 1
+            else:
+                blocker = blockers.bit_length() - 1
+            # Cut the ray off behind the nearest blocker
+            ray ^= masks[blocker]
+        attacks |= ray
+    return attacks
+
+
+def _relevant_masks(directions: Tuple[Tuple[int, int], ...]) -> Tuple:
+    """
+    For each square, the bitboard of squares whose occupancy can change a
+    slider's attacks: its rays without their last (edge) square, since a piece
+    on the edge blocks nothing behind it.
+    """
+    return tuple(
+        _to_bitboard(
+            square
+            for direction in directions
+            for square in _ray(rank, file, direction)[:-1]
+        )
+        for rank in range(8)
+        for file in range(8)
+    )
+
+
+def _attack_tables(relevant_masks: Tuple, ray_masks: Tuple) -> Tuple:
+    """
+    For each square, a dict from every subset of its relevant mask to the
+    slider's attacks with that occupancy. Subsets are enumerated with the
+    Carry-Rippler trick: https://www.chessprogramming.org/Traversing_Subsets_of_a_Set
+    """
+    tables = []
+    for square, mask in enumerate(relevant_masks):
+        table = {}
+        subset = 0
+        while True:
+            table[subset] = sliding_attacks(square, subset, ray_masks)
+            subset = (subset - mask) & mask
+            if not subset:
+                break
+        tables.append(table)
+    return tuple(tables)
+
+
+# Lookup tables for sliding attacks, in the spirit of magic bitboards
+# (https://www.chessprogramming.org/Magic_Bitboards): the attacks of a slider
+# on `square` are BISHOP_ATTACKS[square][occupied & BISHOP_MASKS[square]].
+# Python's dict hashes the masked occupancy directly, so no magic multiplier
+# or shift is needed to turn it into a table index.
+BISHOP_MASKS = _relevant_masks(BISHOP_DIRECTIONS)
+ROOK_MASKS = _relevant_masks(ROOK_DIRECTIONS)
+BISHOP_ATTACKS = _attack_tables(BISHOP_MASKS, BISHOP_RAY_MASKS)
+ROOK_ATTACKS = _attack_tables(ROOK_MASKS, ROOK_RAY_MASKS)
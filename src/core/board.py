@@ -2,52 +2,174 @@
 Board representation and game state management.
 """
 
-from typing import List, Optional, Tuple, Dict, Any
-from src.core.constants import Color, PieceType, GameStatus
-from src.core.piece import Piece
+from typing import Dict, List, Optional, Tuple
+from src.core.constants import (
+    Color,
+    PieceType,
+    GameStatus,
+    PIECE_VALUES,
+    WHITE,
+    BLACK,
+    PAWN,
+    KNIGHT,
+    BISHOP,
+    KING,
+    ALL_CASTLING,
+    CASTLING_MASKS,
+    OPPONENT,
+)
+from src.core.piece import PIECES, Piece, bitboard_index
 from src.core.move import Move
-from collections import defaultdict
+from src.core.attacks import (
+    BETWEEN,
+    BISHOP_ATTACKS,
+    BISHOP_MASKS,
+    DARK_SQUARES,
+    KING_ATTACKS,
+    KNIGHT_ATTACKS,
+    PAWN_ATTACKS,
+    ROOK_ATTACKS,
+    ROOK_MASKS,
+)
+from src.core.zobrist import (
+    CASTLING_KEYS,
+    EN_PASSANT_KEYS,
+    PIECE_SQUARE_KEYS,
+    SIDE_KEY,
+)
+from functools import lru_cache
+
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# Centipawn value of each piece from White's perspective, indexed by bitboard_index
+SIGNED_PIECE_VALUES = tuple(
+    PIECE_VALUES[piece_type] * (1 if color == WHITE else -1)
+    for color in Color
+    for piece_type in PieceType
+)
+
+# 1 for knights, bishops, rooks and queens, 0 for pawns and kings, indexed by
+# bitboard_index (counted in Board.major_minor_count)
+MAJOR_MINOR_PIECES = tuple(
+    int(piece_type not in (PAWN, KING)) for color in Color for piece_type in PieceType
+)
+
+# Reverse lookup from uppercase FEN character to PieceType
+FEN_CHAR_TO_PIECE_TYPE = {piece_type.char: piece_type for piece_type in PieceType}
+
+
+def parse_fen(fen: str) -> Tuple:
+    """
+    Parse a FEN string without touching any board.
+
+    Args:
+        fen: The FEN string to parse
+
+    Returns:
+        (placement, turn, castling_rights, en_passant_square, halfmove, fullmove),
+        where placement is a list of (rank, file, piece) tuples and castling_rights
+        has the bits of Board.castling
+    """
+    rows, color, castling, ep_square, halfmove, fullmove = fen.split()
+    turn = Color.WHITE if color == "w" else Color.BLACK
+    en_passant_square = None
+    if ep_square != "-":
+        en_passant_square = (int(ep_square[1]) - 1, "abcdefgh".index(ep_square[0]))
+    castling_rights = 0
+    for bit, char in enumerate("KQkq"):
+        if char in castling:
+            castling_rights |= 1 << bit
+
+    placement = []
+    for rank, row in enumerate(rows.split("/")):
+        file = 0
+        for char in row:
+            if char.isdigit():
+                file += int(char)
+            else:
+                piece_color = Color.WHITE if char.isupper() else Color.BLACK
+                piece_type = FEN_CHAR_TO_PIECE_TYPE[char.upper()]
+                placement.append(
+                    (7 - rank, file, PIECES[bitboard_index(piece_type, piece_color)])
+                )
+                file += 1
+
+    return (
+        placement,
+        turn,
+        castling_rights,
+        en_passant_square,
+        int(halfmove),
+        int(fullmove),
+    )
 
 
 class Board:
     """
-    Represents the chess board using an 8x8 array.
+    Represents the chess board using a flat list of 64 squares, alongside
+    bitboards.
 
-    Board indexing: board[rank][file]
+    Board indexing: board[rank * 8 + file]
     - rank 0 = rank 1 (white's back rank)
     - rank 7 = rank 8 (black's back rank)
     - file 0 = a-file, file 7 = h-file
 
-    So board[0][0] = A1, board[7][7] = H8
+    So board[0] = A1, board[63] = H8
+
+    Bitboards are ints with one bit per square, numbered the same way: bit
+    (rank * 8 + file). So bit 0 = A1, bit 63 = H8.
+
+    References:
+    - Bitboards: https://www.chessprogramming.org/Bitboards
     """
 
     def __init__(self):
         """Initialize an empty chess board."""
-        # 8x8 array, None represents empty squares
-        self.board: List[List[Optional[Piece]]] = [
-            [None for _ in range(8)] for _ in range(8)
-        ]
-
-        # Keep track of pieces for easy iteration
-        self.white_pieces: set[Tuple[int, int, Piece]] = set()  # (rank, file, piece)
-        self.black_pieces: set[Tuple[int, int, Piece]] = set()  # (rank, file, piece)
+        # Flat array of the 64 squares, indexed by rank * 8 + file like the
+        # bitboards. None represents empty squares
+        self.board: List[Optional[Piece]] = [None] * 64
+
         self.major_minor_count = (
             0  # Major/minor piece count (excluding kings and pawns)
         )
+        # White's material minus Black's, in centipawns
+        self.material_score = 0
+
+        # One bitboard per piece type and color, indexed by Piece.bitboard_index.
+        # Pieces are iterated through these (see get_pieces)
+        self.bitboards: List[int] = [0] * 12
+        self.occupancy: List[int] = [0, 0]  # Per color, indexed by Color
+        self.occupied = 0  # All pieces
+
+        # Zobrist hash of the position, kept up to date incrementally
+        self.hash_key = 0
 
         # Game state
         self.turn = Color.WHITE
         self.en_passant_square: Optional[Tuple[int, int]] = None
-        self.castling_rights = {
-            Color.WHITE: {"kingside": True, "queenside": True},
-            Color.BLACK: {"kingside": True, "queenside": True},
-        }
+        # Castling rights still available, as WHITE_KINGSIDE | BLACK_QUEENSIDE | ...
+        self.castling = ALL_CASTLING
         self.halfmove_clock = 0  # For 50-move rule
         self.fullmove_number = 1
-        self.fen_history: Dict[str, int] = defaultdict(int)  # For threefold repetition
+        # Zobrist keys of the positions so far, current one last (threefold repetition)
+        self.hash_history: List[int] = []
 
-        # Move history for unmake_move
-        self.move_history: List[Tuple[Move, Dict[str, Any]]] = []
+        # Move history for unmake_move: per move, a flat tuple of the move and the
+        # state it cannot be undone without (see make_move)
+        self.move_history: List[Tuple] = []
+
+        # Shared MoveGenerator for this board, created on first use (see movegen)
+        self._movegen = None
+
+    @property
+    def movegen(self):
+        """The MoveGenerator bound to this board, shared by all its users."""
+        if self._movegen is None:
+            # Imported here, movegen imports this module
+            from src.core.movegen import MoveGenerator
+
+            self._movegen = MoveGenerator(self)
+        return self._movegen
 
     def get_piece(self, rank: int, file: int) -> Optional[Piece]:
         """
@@ -62,7 +184,7 @@ class Board:
         """
         if not (0 <= rank < 8 and 0 <= file < 8):
             return None
-        return self.board[rank][file]
+        return self.board[rank * 8 + file]
 
     def set_piece(self, rank: int, file: int, piece: Optional[Piece]) -> None:
         """
@@ -73,32 +195,94 @@ class Board:
             file: The file (0-7)
             piece: The piece to place, or None to clear the square
         """
-        # Remove old piece from piece lists if it exists (get rekt)
-        old_piece = self.board[rank][file]
+        square = rank * 8 + file
+        square_bit = 1 << square
+
+        # Remove old piece from the bitboards if it exists (get rekt)
+        old_piece = self.board[square]
         if old_piece:
-            piece_set = (
-                self.white_pieces
-                if old_piece.color == Color.WHITE
-                else self.black_pieces
-            )
-            # Using set remove instead of discard to catch errors
-            piece_set.remove((rank, file, old_piece))
-            if old_piece.piece_type not in (PieceType.KING, PieceType.PAWN):
-                self.major_minor_count -= 1
+            self.major_minor_count -= MAJOR_MINOR_PIECES[old_piece.bitboard_index]
+            self.material_score -= SIGNED_PIECE_VALUES[old_piece.bitboard_index]
+
+            self.bitboards[old_piece.bitboard_index] ^= square_bit
+            self.hash_key ^= PIECE_SQUARE_KEYS[old_piece.bitboard_index][square]
+            self.occupancy[old_piece.color] ^= square_bit
+            self.occupied ^= square_bit
 
         # Set the new piece
-        self.board[rank][file] = piece
+        self.board[square] = piece
 
-        # Add new piece to piece lists if it exists
+        # Add new piece to the bitboards if it exists
         if piece:
-            if piece.color == Color.WHITE:
-                assert (rank, file, piece) not in self.white_pieces
-                self.white_pieces.add((rank, file, piece))
-            else:
-                assert (rank, file, piece) not in self.black_pieces
-                self.black_pieces.add((rank, file, piece))
-            if piece.piece_type not in (PieceType.KING, PieceType.PAWN):
-                self.major_minor_count += 1
+            self.major_minor_count += MAJOR_MINOR_PIECES[piece.bitboard_index]
+            self.material_score += SIGNED_PIECE_VALUES[piece.bitboard_index]
+
+            self.bitboards[piece.bitboard_index] |= square_bit
+            self.hash_key ^= PIECE_SQUARE_KEYS[piece.bitboard_index][square]
+            self.occupancy[piece.color] |= square_bit
+            self.occupied |= square_bit
+
+    def move_piece(self, from_square: int, to_square: int) -> None:
+        """
+        Move the piece on from_square to the empty to_square.
+
+        Same as clearing from_square and setting the piece on to_square with
+        set_piece, in one update: material and piece counts do not change.
+
+        Args:
+            from_square: The square of the piece (rank * 8 + file)
+            to_square: The empty destination square (rank * 8 + file)
+        """
+        board = self.board
+        piece = board[from_square]
+        board[from_square] = None
+        board[to_square] = piece
+
+        index = piece.bitboard_index
+        squares_bits = (1 << from_square) | (1 << to_square)
+        self.bitboards[index] ^= squares_bits
+        self.occupancy[piece.color] ^= squares_bits
+        self.occupied ^= squares_bits
+        keys = PIECE_SQUARE_KEYS[index]
+        self.hash_key ^= keys[from_square] ^ keys[to_square]
+
+    def _state_hash(self) -> int:
+        """Zobrist keys for castling rights and en passant file."""
+        key = CASTLING_KEYS[self.castling]
+        if self.en_passant_square:
+            key ^= EN_PASSANT_KEYS[self.en_passant_square[1]]
+        return key
+
+    def compute_hash(self) -> int:
+        """Compute the Zobrist hash of the position from scratch."""
+        key = self._state_hash()
+        if self.turn == BLACK:
+            key ^= SIDE_KEY
+        for color in (Color.WHITE, Color.BLACK):
+            for rank, file, piece in self.get_pieces(color):
+                key ^= PIECE_SQUARE_KEYS[piece.bitboard_index][rank * 8 + file]
+        return key
+
+    def get_pieces(self, color: Color) -> List[Tuple[int, int, Piece]]:
+        """
+        Get all pieces of the given color, read off its occupancy bitboard.
+
+        Returns:
+            List of (rank, file, piece) tuples, in square order
+        """
+        board = self.board
+        pieces = []
+        occupancy = self.occupancy[color]
+        while occupancy:
+            square_bit = occupancy & -occupancy
+            square = square_bit.bit_length() - 1
+            pieces.append((square >> 3, square & 7, board[square]))
+            occupancy ^= square_bit
+        return pieces
+
+    def get_bitboard(self, piece_type: PieceType, color: Color) -> int:
+        """Get the bitboard of all pieces of the given type and color."""
+        return self.bitboards[bitboard_index(piece_type, color)]
 
     def square_to_notation(self, rank: int, file: int) -> str:
         """Convert rank/file to algebraic notation (e.g., 0,0 -> 'a1')."""
@@ -121,7 +305,7 @@ class Board:
         for rank in range(7, -1, -1):
             line = f"{rank + 1} |"
             for file in range(8):
-                piece = self.board[rank][file]
+                piece = self.board[rank * 8 + file]
                 if piece:
                     line += f" {str(piece)} |"
                 else:
@@ -139,7 +323,15 @@ class Board:
 
     def opponent_color(self) -> Color:
         """Get the opponent's color."""
-        return Color.BLACK if self.turn == Color.WHITE else Color.WHITE
+        return OPPONENT[self.turn]
+
+    def has_non_pawn_material(self, color: Color) -> bool:
+        """Check if the given color has any piece besides pawns and its king."""
+        return bool(
+            self.occupancy[color]
+            & ~self.get_bitboard(PAWN, color)
+            & ~self.get_bitboard(KING, color)
+        )
 
     def find_king(self, color: Color) -> Optional[Tuple[int, int]]:
         """
@@ -151,11 +343,10 @@ class Board:
         Returns:
             (rank, file) tuple of king position, or None if not found
         """
-        pieces = self.white_pieces if color == Color.WHITE else self.black_pieces
-        for rank, file, piece in pieces:
-            if piece.piece_type == PieceType.KING:
-                return (rank, file)
-        raise ValueError("King must be on the board")
+        king_bitboard = self.bitboards[bitboard_index(KING, color)]
+        if not king_bitboard:
+            raise ValueError("King must be on the board")
+        return divmod(king_bitboard.bit_length() - 1, 8)
 
     def is_square_attacked(self, rank: int, file: int, by_color: Color) -> bool:
         """
@@ -169,93 +360,42 @@ class Board:
         Returns:
             True if the square is attacked, False otherwise
         """
-        # Check for pawn attacks
-        pawn_direction = -1 if by_color == Color.WHITE else 1
-        for df in [-1, 1]:
-            pawn_rank = rank + pawn_direction
-            pawn_file = file + df
-            if 0 <= pawn_rank < 8 and 0 <= pawn_file < 8:
-                piece = self.get_piece(pawn_rank, pawn_file)
-                if (
-                    piece
-                    and piece.color == by_color
-                    and piece.piece_type == PieceType.PAWN
-                ):
-                    return True
+        return self.is_attacked(rank * 8 + file, by_color)
+
+    def is_attacked(self, square: int, by_color: Color) -> bool:
+        """
+        Check if a square, given as rank * 8 + file, is attacked by the given color.
+        """
+        bitboards = self.bitboards
+        base = by_color * 6  # Bitboard index of the attacker's pawns
+
+        # Check for pawn attacks: squares a pawn of the other color on this square
+        # would attack are exactly the squares our pawns attack it from
+        if PAWN_ATTACKS[1 - by_color][square] & bitboards[base]:
+            return True
 
         # Check for knight attacks
-        knight_offsets = [
-            (-2, -1),
-            (-2, 1),
-            (-1, -2),
-            (-1, 2),
-            (1, -2),
-            (1, 2),
-            (2, -1),
-            (2, 1),
-        ]
-        for dr, df in knight_offsets:
-            new_rank = rank + dr
-            new_file = file + df
-            if 0 <= new_rank < 8 and 0 <= new_file < 8:
-                piece = self.get_piece(new_rank, new_file)
-                if (
-                    piece
-                    and piece.color == by_color
-                    and piece.piece_type == PieceType.KNIGHT
-                ):
-                    return True
-
-        # Check for sliding piece attacks (bishop, rook, queen)
-        # Diagonal directions (bishop and queen)
-        diagonal_directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-        for dr, df in diagonal_directions:
-            new_rank = rank + dr
-            new_file = file + df
-            while 0 <= new_rank < 8 and 0 <= new_file < 8:
-                piece = self.get_piece(new_rank, new_file)
-                if piece:
-                    if piece.color == by_color and piece.piece_type in [
-                        PieceType.BISHOP,
-                        PieceType.QUEEN,
-                    ]:
-                        return True
-                    break  # Blocked by any piece
-                new_rank += dr
-                new_file += df
-
-        # Orthogonal directions (rook and queen)
-        orthogonal_directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        for dr, df in orthogonal_directions:
-            new_rank = rank + dr
-            new_file = file + df
-            while 0 <= new_rank < 8 and 0 <= new_file < 8:
-                piece = self.get_piece(new_rank, new_file)
-                if piece:
-                    if piece.color == by_color and piece.piece_type in [
-                        PieceType.ROOK,
-                        PieceType.QUEEN,
-                    ]:
-                        return True
-                    break
-                new_rank += dr
-                new_file += df
+        if KNIGHT_ATTACKS[square] & bitboards[base + 1]:
+            return True
 
         # Check for king attacks
-        for dr in [-1, 0, 1]:
-            for df in [-1, 0, 1]:
-                if dr == 0 and df == 0:
-                    continue
-                new_rank = rank + dr
-                new_file = file + df
-                if 0 <= new_rank < 8 and 0 <= new_file < 8:
-                    piece = self.get_piece(new_rank, new_file)
-                    if (
-                        piece
-                        and piece.color == by_color
-                        and piece.piece_type == PieceType.KING
-                    ):
-                        return True
+        if KING_ATTACKS[square] & bitboards[base + 5]:
+            return True
+
+        # Check for sliding piece attacks (bishop, rook, queen) with one table
+        # lookup per slider type
+        occupied = self.occupied
+        queens = bitboards[base + 4]
+        diagonal_attackers = bitboards[base + 2] | queens
+        if diagonal_attackers and (
+            BISHOP_ATTACKS[square][occupied & BISHOP_MASKS[square]] & diagonal_attackers
+        ):
+            return True
+        orthogonal_attackers = bitboards[base + 3] | queens
+        if orthogonal_attackers and (
+            ROOK_ATTACKS[square][occupied & ROOK_MASKS[square]] & orthogonal_attackers
+        ):
+            return True
 
         return False
 
@@ -269,11 +409,71 @@ class Board:
         Returns:
             True if the king is in check, False otherwise
         """
-        king_rank, king_file = self.find_king(color)
+        # The king's square straight from its bitboard, as in find_king
+        king_square = self.bitboards[color * 6 + 5].bit_length() - 1
+        if king_square < 0:
+            raise ValueError("King must be on the board")
 
         # Check if attacked by the opposite color
-        attacker_color = Color.BLACK if color == Color.WHITE else Color.WHITE
-        return self.is_square_attacked(king_rank, king_file, attacker_color)
+        return self.is_attacked(king_square, OPPONENT[color])
+
+    def legality_masks(self) -> Tuple[int, int, Dict[int, int]]:
+        """
+        Bitboards that decide which moves of the side to move are legal without
+        making them: every move but a king move or en passant capture is legal
+        if it lands on the check mask and, for a pinned piece, stays on its pin ray.
+
+        Returns:
+            (king_square, check_mask, pin_rays): check_mask is every square when
+            not in check, the checker and the squares between it and the king in
+            single check, and empty in double check. pin_rays maps the square of
+            each pinned piece to the squares between the king and its pinner,
+            pinner included.
+        """
+        color = self.turn
+        bitboards = self.bitboards
+        occupied = self.occupied
+        king_square = bitboards[color * 6 + 5].bit_length() - 1
+        base = OPPONENT[color] * 6  # Bitboard index of the enemy pawns
+        queens = bitboards[base + 4]
+        diagonal_attackers = bitboards[base + 2] | queens
+        orthogonal_attackers = bitboards[base + 3] | queens
+
+        checkers = (
+            (PAWN_ATTACKS[color][king_square] & bitboards[base])
+            | (KNIGHT_ATTACKS[king_square] & bitboards[base + 1])
+            | (
+                BISHOP_ATTACKS[king_square][occupied & BISHOP_MASKS[king_square]]
+                & diagonal_attackers
+            )
+            | (
+                ROOK_ATTACKS[king_square][occupied & ROOK_MASKS[king_square]]
+                & orthogonal_attackers
+            )
+        )
+        if not checkers:
+            check_mask = -1  # All squares
+        elif checkers & (checkers - 1):
+            check_mask = 0  # Double check: only the king can move
+        else:
+            check_mask = checkers | BETWEEN[king_square][checkers.bit_length() - 1]
+
+        # Sliders lined up with the king (attacking it on an empty board) pin the
+        # piece between them if it is the only piece there, and one of ours
+        own_pieces = self.occupancy[color]
+        pin_rays = {}
+        pinners = (BISHOP_ATTACKS[king_square][0] & diagonal_attackers) | (
+            ROOK_ATTACKS[king_square][0] & orthogonal_attackers
+        )
+        while pinners:
+            pinner_bit = pinners & -pinners
+            squares_between = BETWEEN[king_square][pinner_bit.bit_length() - 1]
+            blockers = squares_between & occupied
+            if blockers & own_pieces and not blockers & (blockers - 1):
+                pin_rays[blockers.bit_length() - 1] = squares_between | pinner_bit
+            pinners ^= pinner_bit
+
+        return king_square, check_mask, pin_rays
 
     def is_insufficient_material(self) -> bool:
         """
@@ -282,38 +482,47 @@ class Board:
         Returns:
             True if insufficient material, False otherwise
         """
+        bitboards = self.bitboards
         # All pieces except kings
-        pieces = [
-            (rank, file, piece)
-            for rank, file, piece in list(self.white_pieces) + list(self.black_pieces)
-            if piece.piece_type != PieceType.KING
-        ]
+        pieces = self.occupied ^ bitboards[KING - 1] ^ bitboards[6 + KING - 1]
+        piece_count = pieces.bit_count()
 
         # King vs King
-        if len(pieces) == 0:
+        if piece_count == 0:
             return True
 
+        bishops = bitboards[BISHOP - 1] | bitboards[6 + BISHOP - 1]
+
         # King vs King and Bishop/Knight
-        if len(pieces) == 1:
-            _, _, piece = pieces[0]
-            if piece.piece_type in [PieceType.BISHOP, PieceType.KNIGHT]:
-                return True
+        if piece_count == 1:
+            knights = bitboards[KNIGHT - 1] | bitboards[6 + KNIGHT - 1]
+            return bool(pieces & (bishops | knights))
 
         # King and Bishop vs King and Bishop (same color bishops)
-        if len(pieces) == 2:
-            rank1, file1, piece1 = pieces[0]
-            rank2, file2, piece2 = pieces[1]
-            if (
-                piece1.piece_type == PieceType.BISHOP
-                and piece2.piece_type == PieceType.BISHOP
-            ):
-                square_color1 = (rank1 + file1) % 2
-                square_color2 = (rank2 + file2) % 2
-                if square_color1 == square_color2:
-                    return True
+        if piece_count == 2 and bishops == pieces:
+            dark_bishops = bishops & DARK_SQUARES
+            return dark_bishops == 0 or dark_bishops == bishops
 
         return False
 
+    def is_threefold_repetition(self) -> bool:
+        """
+        Check if the current position has occurred three times.
+        Only positions since the last capture or pawn move (as counted by the
+        halfmove clock) can repeat, so only those are compared. Of those, only
+        positions with the same side to move, from 4 plies back, can be equal,
+        so every other one is compared starting there.
+
+        Returns:
+            True if the position is repeated for the third time, False otherwise
+        """
+        halfmove_clock = self.halfmove_clock
+        if halfmove_clock < 8:
+            return False  # A position needs 4 plies to come back, twice
+        # hash_history[-1] is the current position, hash_history[-5] 4 plies back
+        earlier_positions = self.hash_history[-5 : -halfmove_clock - 2 : -2]
+        return earlier_positions.count(self.hash_key) >= 2
+
     def is_game_over(self) -> bool:
         """
         Check if the game is over.
@@ -336,10 +545,8 @@ class Board:
             return True
 
         # Threefold repetition
-        if self.fen_history[self.position_fen()] >= 3:
+        if self.is_threefold_repetition():
             return True
-        else:
-            assert max(self.fen_history.values(), default=0) < 3  # Sanity check
 
         # Insufficient material
         if self.is_insufficient_material():
@@ -358,19 +565,13 @@ class Board:
         if self.is_technical_draw():
             return GameStatus.DRAW
 
-        from src.core.movegen import MoveGenerator
-
-        move_gen = MoveGenerator(self)
-
         # No legal moves (checkmate or stalemate)
-        legal_moves = move_gen.generate_legal_moves()
+        legal_moves = self.movegen.generate_legal_moves()
         if not legal_moves:
             # Checkmate
             if self.is_in_check(self.turn):
                 return (
-                    GameStatus.BLACK_WON
-                    if self.turn == Color.WHITE
-                    else GameStatus.WHITE_WON
+                    GameStatus.BLACK_WON if self.turn == WHITE else GameStatus.WHITE_WON
                 )
             # Stalemate
             else:
@@ -387,17 +588,14 @@ class Board:
         Args:
             move: The move to make
         """
-        # Save state for unmake_move
-        state = {
-            "en_passant_square": self.en_passant_square,
-            "castling_rights": {
-                Color.WHITE: self.castling_rights[Color.WHITE].copy(),
-                Color.BLACK: self.castling_rights[Color.BLACK].copy(),
-            },
-            "halfmove_clock": self.halfmove_clock,
-            "fullmove_number": self.fullmove_number,
-            "captured_piece": None,
-        }
+        # Save state for unmake_move (recorded in move_history once the move is made)
+        en_passant_square = self.en_passant_square
+        castling = self.castling
+        halfmove_clock = self.halfmove_clock
+        hash_key = self.hash_key
+        captured_piece = None
+        # Castling rights and en passant are re-hashed once the move is made
+        self.hash_key ^= self._state_hash()
 
         moving_piece = self.get_piece(move.from_rank, move.from_file)
         if moving_piece is None:
@@ -406,54 +604,44 @@ class Board:
         # Handle captures
         if move.is_en_passant:
             # Remove the captured pawn
-            capture_rank = move.to_rank - (
-                1 if moving_piece.color == Color.WHITE else -1
-            )
+            # One rank behind the target square: below it for White (color 0),
+            # above it for Black (color 1)
+            capture_rank = move.to_rank + 2 * moving_piece.color - 1
             captured_piece = self.get_piece(capture_rank, move.to_file)
-            assert captured_piece.piece_type == PieceType.PAWN
-            state["captured_piece"] = (capture_rank, move.to_file, captured_piece)
             self.set_piece(capture_rank, move.to_file, None)
             self.halfmove_clock = 0
         elif move.captured_piece_type:
             captured_piece = self.get_piece(move.to_rank, move.to_file)
-            state["captured_piece"] = (move.to_rank, move.to_file, captured_piece)
             self.halfmove_clock = 0
-        elif moving_piece.piece_type == PieceType.PAWN:
+        elif moving_piece.piece_type == PAWN:
             self.halfmove_clock = 0
         else:
             self.halfmove_clock += 1
 
         # Move the piece
-        self.set_piece(move.from_rank, move.from_file, None)
-
-        # Handle promotion
         if move.promotion_piece_type:
-            promoted_piece = Piece(move.promotion_piece_type, moving_piece.color)
+            promoted_piece = PIECES[
+                bitboard_index(move.promotion_piece_type, moving_piece.color)
+            ]
+            self.set_piece(move.from_rank, move.from_file, None)
             self.set_piece(move.to_rank, move.to_file, promoted_piece)
-        else:
+        elif captured_piece and not move.is_en_passant:
+            self.set_piece(move.from_rank, move.from_file, None)
             self.set_piece(move.to_rank, move.to_file, moving_piece)
+        else:
+            self.move_piece(move.key >> 6 & 63, move.key & 63)
 
         # Handle castling
         if move.is_castling:
             # Move the rook
+            rank_square = move.from_rank * 8
             if move.to_file == 6:  # Kingside
-                rook = self.get_piece(move.from_rank, 7)
-                assert rook and rook.piece_type == PieceType.ROOK
-                assert self.get_piece(move.from_rank, 5) is None
-                self.set_piece(move.from_rank, 7, None)
-                self.set_piece(move.from_rank, 5, rook)
+                self.move_piece(rank_square + 7, rank_square + 5)
             else:  # Queenside (to_file == 2)
-                rook = self.get_piece(move.from_rank, 0)
-                assert rook and rook.piece_type == PieceType.ROOK
-                assert self.get_piece(move.from_rank, 3) is None
-                self.set_piece(move.from_rank, 0, None)
-                self.set_piece(move.from_rank, 3, rook)
+                self.move_piece(rank_square, rank_square + 3)
 
         # Update en passant square
-        if (
-            moving_piece.piece_type == PieceType.PAWN
-            and abs(move.to_rank - move.from_rank) == 2
-        ):
+        if moving_piece.piece_type == PAWN and abs(move.to_rank - move.from_rank) == 2:
             # Double pawn push - set en passant square
             self.en_passant_square = (
                 (move.from_rank + move.to_rank) // 2,
@@ -462,47 +650,45 @@ class Board:
         else:
             self.en_passant_square = None
 
-        # Update castling rights
-        if moving_piece.piece_type == PieceType.KING:
-            self.castling_rights[moving_piece.color]["kingside"] = False
-            self.castling_rights[moving_piece.color]["queenside"] = False
-        elif moving_piece.piece_type == PieceType.ROOK:
-            if move.from_file == 0:  # Queenside rook
-                self.castling_rights[moving_piece.color]["queenside"] = False
-            elif move.from_file == 7:  # Kingside rook
-                self.castling_rights[moving_piece.color]["kingside"] = False
-
-        # If a rook is captured, update opponent's castling rights
-        if move.captured_piece_type == PieceType.ROOK:
-            opponent = self.opponent_color()
-            if move.to_file == 0 and move.to_rank == (
-                0 if opponent == Color.WHITE else 7
-            ):
-                self.castling_rights[opponent]["queenside"] = False
-            elif move.to_file == 7 and move.to_rank == (
-                0 if opponent == Color.WHITE else 7
-            ):
-                self.castling_rights[opponent]["kingside"] = False
+        # Update castling rights: moving from or to a king or rook starting square
+        self.castling &= (
+            CASTLING_MASKS[move.from_rank * 8 + move.from_file]
+            & CASTLING_MASKS[move.to_rank * 8 + move.to_file]
+        )
 
         # Update turn
-        if self.turn == Color.BLACK:
+        if self.turn == BLACK:
             self.fullmove_number += 1
-        self.turn = self.opponent_color()
+        self.turn = OPPONENT[self.turn]
+        self.hash_key ^= self._state_hash() ^ SIDE_KEY
 
         # Save to history
-        self.move_history.append((move, state))
-        self.fen_history[self.position_fen()] += 1
+        self.move_history.append(
+            (
+                move,
+                en_passant_square,
+                castling,
+                halfmove_clock,
+                hash_key,
+                captured_piece,
+            )
+        )
+        self.hash_history.append(self.hash_key)
 
     def unmake_move(self) -> None:
         """Unmake the last move."""
         if not self.move_history:
             raise ValueError("No moves to unmake")
 
-        # Decrement FEN history
-        position_fen = self.position_fen()
-        self.fen_history[position_fen] -= 1
-        assert self.fen_history[position_fen] >= 0
-        move, state = self.move_history.pop()
+        self.hash_history.pop()
+        (
+            move,
+            en_passant_square,
+            castling,
+            halfmove_clock,
+            hash_key,
+            captured_piece,
+        ) = self.move_history.pop()
 
         # Get the piece that was moved (it's now at the destination)
         moving_piece = self.get_piece(move.to_rank, move.to_file)
@@ -511,38 +697,73 @@ class Board:
 
         # Handle promotion - restore to pawn
         if move.promotion_piece_type:
-            moving_piece = Piece(PieceType.PAWN, moving_piece.color)
+            moving_piece = PIECES[bitboard_index(PAWN, moving_piece.color)]
 
         # Move piece back
-        self.set_piece(move.to_rank, move.to_file, None)
-        self.set_piece(move.from_rank, move.from_file, moving_piece)
+        if move.promotion_piece_type:
+            self.set_piece(move.to_rank, move.to_file, None)
+            self.set_piece(move.from_rank, move.from_file, moving_piece)
+        else:
+            self.move_piece(move.key & 63, move.key >> 6 & 63)
 
-        # Restore captured piece
-        if state["captured_piece"]:
-            cap_rank, cap_file, captured_piece = state["captured_piece"]
-            self.set_piece(cap_rank, cap_file, captured_piece)
+        # Restore captured piece, on the square the move took it from
+        if captured_piece:
+            if move.is_en_passant:
+                self.set_piece(move.from_rank, move.to_file, captured_piece)
+            else:
+                self.set_piece(move.to_rank, move.to_file, captured_piece)
 
         # Undo castling rook move
         if move.is_castling:
+            rank_square = move.from_rank * 8
             if move.to_file == 6:  # Kingside
-                rook = self.get_piece(move.from_rank, 5)
-                assert rook and rook.piece_type == PieceType.ROOK
-                assert self.get_piece(move.from_rank, 7) is None
-                self.set_piece(move.from_rank, 5, None)
-                self.set_piece(move.from_rank, 7, rook)
+                self.move_piece(rank_square + 5, rank_square + 7)
             else:  # Queenside
-                rook = self.get_piece(move.from_rank, 3)
-                assert rook and rook.piece_type == PieceType.ROOK
-                assert self.get_piece(move.from_rank, 0) is None
-                self.set_piece(move.from_rank, 3, None)
-                self.set_piece(move.from_rank, 0, rook)
+                self.move_piece(rank_square + 3, rank_square)
 
         # Restore game state
-        self.turn = self.opponent_color()
-        self.en_passant_square = state["en_passant_square"]
-        self.castling_rights = state["castling_rights"]
-        self.halfmove_clock = state["halfmove_clock"]
-        self.fullmove_number = state["fullmove_number"]
+        self.turn = OPPONENT[self.turn]
+        self.en_passant_square = en_passant_square
+        self.castling = castling
+        self.halfmove_clock = halfmove_clock
+        if self.turn == BLACK:
+            self.fullmove_number -= 1
+        self.hash_key = hash_key
+
+    def make_null_move(self) -> Optional[Tuple[int, int]]:
+        """
+        Pass the turn to the opponent without moving, for null-move pruning.
+        Not recorded in the move history, undo it with unmake_null_move. It counts
+        as a ply in hash_history and the halfmove clock, so repetitions are still
+        compared with the same side to move.
+
+        Returns:
+            The en passant square it cleared, to pass back to unmake_null_move
+        """
+        en_passant_square = self.en_passant_square
+        if en_passant_square:
+            self.hash_key ^= EN_PASSANT_KEYS[en_passant_square[1]]
+            self.en_passant_square = None
+        self.turn = OPPONENT[self.turn]
+        self.hash_key ^= SIDE_KEY
+        self.halfmove_clock += 1
+        self.hash_history.append(self.hash_key)
+        return en_passant_square
+
+    def unmake_null_move(self, en_passant_square: Optional[Tuple[int, int]]) -> None:
+        """
+        Undo make_null_move.
+
+        Args:
+            en_passant_square: The en passant square returned by make_null_move
+        """
+        self.hash_history.pop()
+        self.halfmove_clock -= 1
+        self.turn = OPPONENT[self.turn]
+        self.hash_key ^= SIDE_KEY
+        if en_passant_square:
+            self.en_passant_square = en_passant_square
+            self.hash_key ^= EN_PASSANT_KEYS[en_passant_square[1]]
 
     def to_fen(self) -> str:
         """
@@ -572,18 +793,12 @@ class Board:
         fen_position = "/".join(fen_parts)
 
         # Active color
-        fen_active_color = "w" if self.turn == Color.WHITE else "b"
+        fen_active_color = "w" if self.turn == WHITE else "b"
 
         # Castling rights
-        castling = ""
-        if self.castling_rights[Color.WHITE]["kingside"]:
-            castling += "K"
-        if self.castling_rights[Color.WHITE]["queenside"]:
-            castling += "Q"
-        if self.castling_rights[Color.BLACK]["kingside"]:
-            castling += "k"
-        if self.castling_rights[Color.BLACK]["queenside"]:
-            castling += "q"
+        castling = "".join(
+            char for bit, char in enumerate("KQkq") if self.castling & (1 << bit)
+        )
         if castling == "":
             castling = "-"
 
@@ -630,46 +845,55 @@ class Board:
         Args:
             fen: The FEN string to set up the board
         """
-        self.board = [[None for _ in range(8)] for _ in range(8)]
-        self.white_pieces = set()
-        self.black_pieces = set()
-
-        rows, color, castling, ep_square, halfmove, fullmove = fen.split()
-        self.turn = Color.WHITE if color == "w" else Color.BLACK
-        self.en_passant_square = (
-            self.notation_to_square(ep_square) if ep_square != "-" else None
+        placement, turn, castling_rights, en_passant_square, halfmove, fullmove = (
+            parse_fen(fen)
         )
-        self.castling_rights = {
-            Color.WHITE: {"kingside": "K" in castling, "queenside": "Q" in castling},
-            Color.BLACK: {"kingside": "k" in castling, "queenside": "q" in castling},
-        }
-        self.halfmove_clock = int(halfmove)
-        self.fullmove_number = int(fullmove)
-
-        # Unfortunately, fen_history and move_history cannot be reconstructed from FEN
-        self.fen_history = defaultdict(int)
-        self.fen_history[self.position_fen_from_fen(fen)] = 1  # Current position
+        self.board = [None] * 64
+        self.major_minor_count = 0
+        self.material_score = 0
+        self.bitboards = [0] * 12
+        self.occupancy = [0, 0]
+        self.occupied = 0
+        self.hash_key = 0
+
+        self.turn = turn
+        self.en_passant_square = en_passant_square
+        self.castling = castling_rights
+        self.halfmove_clock = halfmove
+        self.fullmove_number = fullmove
+
+        # Unfortunately, hash_history and move_history cannot be reconstructed from FEN
         self.move_history = []
 
-        rows = rows.split("/")
-        for rank in range(8):
-            file = 0
-            for char in rows[rank]:
-                if char.isdigit():
-                    file += int(char)
-                else:
-                    piece_color = Color.WHITE if char.isupper() else Color.BLACK
-                    # Build a reverse lookup from char to PieceType
-                    fen_char_to_piece_type = {pt.char.upper(): pt for pt in PieceType}
-                    piece_type = fen_char_to_piece_type[char.upper()]
-                    piece = Piece(piece_type, piece_color)
-                    self.set_piece(7 - rank, file, piece)
-                    file += 1
+        for rank, file, piece in placement:
+            self.set_piece(rank, file, piece)
+        self.hash_key ^= self._state_hash()
+        if turn == BLACK:
+            self.hash_key ^= SIDE_KEY
+        self.hash_history = [self.hash_key]  # Current position
 
     def setup_initial_position(self) -> None:
         """Set up the standard chess starting position."""
-        initial_fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
-        self.from_fen(initial_fen)
+        # Copy a board set up once from the starting FEN, rather than placing pieces
+        self._copy_position(_starting_board())
+
+    def _copy_position(self, other: "Board") -> None:
+        """Set this board to a copy of another board's position, without its moves."""
+        self.board = other.board[:]
+        self.major_minor_count = other.major_minor_count
+        self.material_score = other.material_score
+        self.bitboards = other.bitboards[:]
+        self.occupancy = other.occupancy[:]
+        self.occupied = other.occupied
+        self.hash_key = other.hash_key
+
+        self.turn = other.turn
+        self.en_passant_square = other.en_passant_square
+        self.castling = other.castling
+        self.halfmove_clock = other.halfmove_clock
+        self.fullmove_number = other.fullmove_number
+        self.hash_history = other.hash_history[:]
+        self.move_history = []
 
     def get_move_from_uci(self, uci: str) -> Move:
         """
@@ -688,9 +912,7 @@ class Board:
 
         promotion_piece_type = None
         if len(uci) == 5:
-            promotion_char = uci[4].upper()
-            fen_char_to_piece_type = {pt.char.upper(): pt for pt in PieceType}
-            promotion_piece_type = fen_char_to_piece_type[promotion_char]
+            promotion_piece_type = FEN_CHAR_TO_PIECE_TYPE[uci[4].upper()]
 
         moving_piece = self.get_piece(from_rank, from_file)
         if moving_piece is None:
@@ -698,7 +920,7 @@ class Board:
 
         captured_piece_type = None
         is_en_passant = (
-            moving_piece.piece_type == PieceType.PAWN
+            moving_piece.piece_type == PAWN
             and (to_rank, to_file) == self.en_passant_square
         )
         if is_en_passant:
@@ -707,7 +929,7 @@ class Board:
             captured_piece_type = self.get_piece(to_rank, to_file).piece_type
 
         is_castling = (
-            moving_piece.piece_type == PieceType.KING
+            moving_piece.piece_type == KING
             and abs(to_rank - from_rank) == 0
             and abs(to_file - from_file) == 2
         )
@@ -722,3 +944,11 @@ class Board:
             is_castling=is_castling,
             promotion_piece_type=promotion_piece_type,
         )
+
+
+@lru_cache(maxsize=None)
+def _starting_board() -> Board:
+    """Board in the starting position, built on first use and never mutated."""
+    board = Board()
+    board.from_fen(STARTING_FEN)
+    return board
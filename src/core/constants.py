@@ -2,31 +2,80 @@
 Constants and enumerations used throughout the chess engine.
 """
 
-from enum import Enum, auto
+from enum import Enum, IntEnum, auto
 
 
-class Color(Enum):
-    """Represents the color of a chess piece."""
+class Color(IntEnum):
+    """
+    Represents the color of a chess piece.
+
+    An IntEnum, so colors compare and index as plain ints on hot paths;
+    .name and .value still work as for any Enum.
+    """
 
     WHITE = 0
     BLACK = 1
 
 
-class PieceType(Enum):
-    """Represents the type of a chess piece."""
+class PieceType(IntEnum):
+    """
+    Represents the type of a chess piece.
+
+    An IntEnum whose int value is the piece's id (1-6), so piece types can index
+    tables directly; the other fields are plain attributes.
+    """
+
+    PAWN = (1, 100, "P", False)
+    KNIGHT = (2, 320, "N", True)
+    BISHOP = (3, 330, "B", True)
+    ROOK = (4, 500, "R", True)
+    QUEEN = (5, 900, "Q", True)
+    KING = (6, 20_000, "K", False)
+
+    def __new__(cls, id, centipawn_value, char, is_promotable):
+        member = int.__new__(cls, id)
+        member._value_ = id
+        member.id = id
+        member.centipawn_value = centipawn_value  # can't use 'value', reserved by Enum
+        member.char = char
+        member.is_promotable = is_promotable
+        return member
+
+
+# The enum members as plain ints, for comparisons and indexing on hot paths:
+# reading a member off its Enum class (e.g. PieceType.PAWN) costs several times
+# more than reading a module global. Values stored on pieces and boards stay
+# enum members, these compare equal to them
+WHITE, BLACK = int(Color.WHITE), int(Color.BLACK)
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = (int(piece_type) for piece_type in PieceType)
+# The opponent of each color, indexed by Color
+OPPONENT = (Color.BLACK, Color.WHITE)
 
-    PAWN = (auto(), 100, "P", False)
-    KNIGHT = (auto(), 320, "N", True)
-    BISHOP = (auto(), 330, "B", True)
-    ROOK = (auto(), 500, "R", True)
-    QUEEN = (auto(), 900, "Q", True)
-    KING = (auto(), 20_000, "K", False)
+# Castling rights, as bits of Board.castling
+WHITE_KINGSIDE, WHITE_QUEENSIDE, BLACK_KINGSIDE, BLACK_QUEENSIDE = 1, 2, 4, 8
+ALL_CASTLING = 0b1111
+# The kingside and queenside castling bits of each color, indexed by Color
+KINGSIDE_CASTLING = (WHITE_KINGSIDE, BLACK_KINGSIDE)
+QUEENSIDE_CASTLING = (WHITE_QUEENSIDE, BLACK_QUEENSIDE)
+# Castling rights that survive a move from or to each square (rank * 8 + file):
+# moving a king or rook off its starting square, or capturing a rook on it,
+# clears the rights that need it. Other squares keep all rights
+_CASTLING_SQUARES = {
+    0: WHITE_QUEENSIDE,  # a1
+    4: WHITE_KINGSIDE | WHITE_QUEENSIDE,  # e1
+    7: WHITE_KINGSIDE,  # h1
+    56: BLACK_QUEENSIDE,  # a8
+    60: BLACK_KINGSIDE | BLACK_QUEENSIDE,  # e8
+    63: BLACK_KINGSIDE,  # h8
+}
+CASTLING_MASKS = tuple(
+    ALL_CASTLING & ~_CASTLING_SQUARES.get(square, 0) for square in range(64)
+)
 
-    def __init__(self, id, centipawn_value, char, is_promotable):
-        self.id = id
-        self.centipawn_value = centipawn_value  # can't use 'value', reserved by Enum
-        self.char = char
-        self.is_promotable = is_promotable
+# Centipawn values indexed by PieceType (index 0 unused)
+PIECE_VALUES = (0,) + tuple(piece_type.centipawn_value for piece_type in PieceType)
+# Uppercase (white) FEN characters indexed by PieceType (index 0 unused)
+PIECE_CHARS = ("",) + tuple(piece_type.char for piece_type in PieceType)
 
 
 class GameStatus(Enum):
@@ -3,7 +3,12 @@ Move representation for the chess engine.
 """
 
 from typing import Optional
-from src.core.constants import PieceType
+from src.core.constants import PIECE_CHARS, PieceType
+
+# Move.key packs from square * 64 + to square (squares as rank * 8 + file) into
+# its low bits, and the promotion piece type id (0 if none) above them
+MOVE_SQUARES_MASK = 0xFFF
+PROMOTION_SHIFT = 12
 
 
 class Move:
@@ -13,6 +18,19 @@ class Move:
     Stores all information needed to make and unmake moves.
     """
 
+    # Fixed attributes: smaller instances and faster attribute access
+    __slots__ = (
+        "from_rank",
+        "from_file",
+        "to_rank",
+        "to_file",
+        "captured_piece_type",
+        "is_en_passant",
+        "is_castling",
+        "promotion_piece_type",
+        "key",
+    )
+
     def __init__(
         self,
         from_rank: int,
@@ -45,6 +63,10 @@ class Move:
         self.is_en_passant = is_en_passant
         self.is_castling = is_castling
         self.promotion_piece_type = promotion_piece_type
+        # Identifies the move within a position, as one int (see MOVE_SQUARES_MASK)
+        self.key = (from_rank * 8 + from_file) * 64 + to_rank * 8 + to_file
+        if promotion_piece_type:
+            self.key |= promotion_piece_type << PROMOTION_SHIFT
 
     def __repr__(self):
         """String representation of the move."""
@@ -77,29 +99,15 @@ class Move:
         """Check if two moves are equal."""
         if not isinstance(other, Move):
             return False
-        # Only compare essential parts: from/to squares and promotion
+        # Only compare essential parts: from/to squares and promotion, all in key
         # Metadata like captured_piece_type, is_en_passant, is_castling
         # can be inferred from board state and shouldn't affect equality
-        return (
-            self.from_rank == other.from_rank
-            and self.from_file == other.from_file
-            and self.to_rank == other.to_rank
-            and self.to_file == other.to_file
-            and self.promotion_piece_type == other.promotion_piece_type
-        )
+        return self.key == other.key
 
     def __hash__(self):
         """Make Move hashable for use in sets and dicts."""
         # Must be consistent with __eq__: only hash essential parts
-        return hash(
-            (
-                self.from_rank,
-                self.from_file,
-                self.to_rank,
-                self.to_file,
-                self.promotion_piece_type,
-            )
-        )
+        return self.key
 
     def to_uci(self) -> str:
         """Convert the move to UCI format (e.g., 'e2e4', 'e7e8q')."""
@@ -111,6 +119,6 @@ class Move:
             assert (
                 self.promotion_piece_type.is_promotable
             ), "Invalid promotion piece type"
-            uci_move += self.promotion_piece_type.char.lower()
+            uci_move += PIECE_CHARS[self.promotion_piece_type].lower()
 
         return uci_move
@@ -5,10 +5,43 @@ This module handles generating all legal moves for each piece type,
 including special moves like castling, en passant, and pawn promotion.
 """
 
-from typing import List, Tuple
-from src.core.constants import Color, PieceType
+from typing import List
+from src.core.constants import (
+    Color,
+    PieceType,
+    WHITE,
+    PAWN,
+    BISHOP,
+    ROOK,
+    KINGSIDE_CASTLING,
+    QUEENSIDE_CASTLING,
+    OPPONENT,
+)
 from src.core.move import Move
 from src.core.board import Board
+from src.core.attacks import (
+    BISHOP_ATTACKS,
+    BISHOP_MASKS,
+    KING_ATTACKS,
+    KNIGHT_ATTACKS,
+    NOT_FILE_A,
+    NOT_FILE_H,
+    PAWN_ATTACKS,
+    RANK_1,
+    RANK_3,
+    RANK_6,
+    RANK_8,
+    ROOK_ATTACKS,
+    ROOK_MASKS,
+)
+
+# Pawns promote to these, strongest first
+PROMOTION_PIECE_TYPES = (
+    PieceType.QUEEN,
+    PieceType.ROOK,
+    PieceType.BISHOP,
+    PieceType.KNIGHT,
+)
 
 
 class MoveGenerator:
@@ -22,6 +55,20 @@ class MoveGenerator:
             board: The Board instance to generate moves for
         """
         self.board = board
+        self.move_generators = {
+            PieceType.KNIGHT: self._generate_knight_moves,
+            PieceType.BISHOP: self._generate_sliding_moves,
+            PieceType.ROOK: self._generate_sliding_moves,
+            PieceType.QUEEN: self._generate_sliding_moves,
+            PieceType.KING: self._generate_king_moves,
+        }
+        self.capture_generators = {
+            PieceType.KNIGHT: self._generate_knight_captures,
+            PieceType.BISHOP: self._generate_sliding_captures,
+            PieceType.ROOK: self._generate_sliding_captures,
+            PieceType.QUEEN: self._generate_sliding_captures,
+            PieceType.KING: self._generate_king_captures,
+        }
 
     def generate_legal_moves(self) -> List[Move]:
         """
@@ -30,15 +77,51 @@ class MoveGenerator:
         Returns:
             List of legal Move objects
         """
-        pseudo_legal_moves = self.generate_pseudo_legal_moves()
-        legal_moves = []
-
         # Filter out moves that leave the king in check
-        for move in pseudo_legal_moves:
-            if self._is_legal(move):
-                legal_moves.append(move)
+        return self._filter_legal(self.generate_pseudo_legal_moves())
 
-        return legal_moves
+    def generate_legal_captures(self) -> List[Move]:
+        """
+        Generate all legal captures (including en passant) for the current position,
+        without generating quiet moves.
+
+        Returns:
+            List of legal capturing Move objects
+        """
+        return self._filter_legal(self.generate_pseudo_legal_captures())
+
+    def generate_pseudo_legal_captures(self) -> List[Move]:
+        """
+        Generate all pseudo-legal captures (including en passant) for the current
+        player, which may leave the king in check.
+
+        Returns:
+            List of pseudo-legal capturing Move objects
+        """
+        color = self.board.turn
+        captures = self._generate_pawn_moves(color, captures_only=True)
+
+        capture_generators = self.capture_generators
+        squares = self.board.board
+        pieces = self.board.occupancy[color] & ~self.board.get_bitboard(PAWN, color)
+        while pieces:
+            square_bit = pieces & -pieces
+            square = square_bit.bit_length() - 1
+            piece = squares[square]
+            captures.extend(
+                capture_generators[piece.piece_type](square >> 3, square & 7, piece)
+            )
+            pieces ^= square_bit
+        return captures
+
+    def has_legal_move(self) -> bool:
+        """
+        Check whether the current player has any legal move, stopping at the first.
+
+        Returns:
+            True if there is at least one legal move, False otherwise
+        """
+        return any(self._is_legal(move) for move in self.generate_pseudo_legal_moves())
 
     def generate_pseudo_legal_moves(self) -> List[Move]:
         """
@@ -59,256 +142,211 @@ class MoveGenerator:
         Returns:
             List of pseudo-legal Move objects
         """
-        moves = []
-
-        # Get pieces for the current player
-        pieces = (
-            self.board.white_pieces if color == Color.WHITE else self.board.black_pieces
-        )
-
-        move_generators = {
-            PieceType.PAWN: self._generate_pawn_moves,
-            PieceType.KNIGHT: self._generate_knight_moves,
-            PieceType.BISHOP: self._generate_bishop_moves,
-            PieceType.ROOK: self._generate_rook_moves,
-            PieceType.QUEEN: self._generate_queen_moves,
-            PieceType.KING: self._generate_king_moves,
-        }
-        for rank, file, piece in pieces:
-            generator = move_generators.get(piece.piece_type)
-            assert generator is not None  # Should never be None
-            moves.extend(generator(rank, file, piece))
+        # All pawns at once, then the other pieces one by one
+        moves = self._generate_pawn_moves(color)
+
+        # Walk the color's pieces straight off its occupancy bitboard
+        move_generators = self.move_generators
+        squares = self.board.board
+        pieces = self.board.occupancy[color] & ~self.board.get_bitboard(PAWN, color)
+        while pieces:
+            square_bit = pieces & -pieces
+            square = square_bit.bit_length() - 1
+            piece = squares[square]
+            moves.extend(
+                move_generators[piece.piece_type](square >> 3, square & 7, piece)
+            )
+            pieces ^= square_bit
         return moves
 
-    def _generate_pawn_moves(self, rank: int, file: int, piece) -> List[Move]:
-        """Generate all pawn moves from the given position."""
-        moves = []
-        direction = 1 if piece.color == Color.WHITE else -1
-        start_rank = 1 if piece.color == Color.WHITE else 6
-        promotion_rank = 7 if piece.color == Color.WHITE else 0
-
-        # Single push
-        new_rank = rank + direction
-        if 0 <= new_rank < 8 and self.board.get_piece(new_rank, file) is None:
-            # Check for promotion
-            if new_rank == promotion_rank:
-                for promo_type in [
-                    PieceType.QUEEN,
-                    PieceType.ROOK,
-                    PieceType.BISHOP,
-                    PieceType.KNIGHT,
-                ]:
-                    moves.append(
-                        Move(
-                            rank, file, new_rank, file, promotion_piece_type=promo_type
-                        )
-                    )
-            else:
-                moves.append(Move(rank, file, new_rank, file))
-
-            # Double push from starting position
-            if rank == start_rank:
-                single_rank = rank + direction
-                double_rank = rank + 2 * direction
-                if (
-                    self.board.get_piece(single_rank, file) is None
-                    and self.board.get_piece(double_rank, file) is None
-                ):
-                    moves.append(Move(rank, file, double_rank, file))
-
-        # Captures (including en passant)
-        for df in [-1, 1]:
-            new_file = file + df
-            if not (0 <= new_file < 8):
-                continue
-
-            new_rank = rank + direction
-            if not (0 <= new_rank < 8):
-                continue
+    def _generate_pawn_moves(self, color: Color, captures_only: bool = False):
+        """
+        Generate the moves of all pawns of a color at once, by shifting the whole
+        pawn bitboard: pushes, double pushes, captures (including en passant) and
+        promotions.
 
-            target = self.board.get_piece(new_rank, new_file)
-
-            # Regular capture
-            if target and target.color != piece.color:
-                if new_rank == promotion_rank:
-                    for promo_type in [
-                        PieceType.QUEEN,
-                        PieceType.ROOK,
-                        PieceType.BISHOP,
-                        PieceType.KNIGHT,
-                    ]:
-                        moves.append(
-                            Move(
-                                rank,
-                                file,
-                                new_rank,
-                                new_file,
-                                captured_piece_type=target.piece_type,
-                                promotion_piece_type=promo_type,
-                            )
-                        )
-                else:
-                    moves.append(
-                        Move(
-                            rank,
-                            file,
-                            new_rank,
-                            new_file,
-                            captured_piece_type=target.piece_type,
-                        )
-                    )
+        Args:
+            color: The color to generate pawn moves for
+            captures_only: Only generate captures (including en passant)
+        """
+        board = self.board
+        pawns = board.get_bitboard(PAWN, color)
+        enemies = board.occupancy[1 - color]
+        moves = []
+        if not pawns:
+            return moves
 
-            # En passant
-            elif self.board.en_passant_square == (new_rank, new_file):
+        # Each target set comes with the square offset from its pawns' squares
+        if color == WHITE:
+            captures = (
+                (((pawns & NOT_FILE_A) << 7) & enemies, 7),
+                (((pawns & NOT_FILE_H) << 9) & enemies, 9),
+            )
+            promotion_rank = RANK_8
+        else:
+            captures = (
+                (((pawns & NOT_FILE_A) >> 9) & enemies, -9),
+                (((pawns & NOT_FILE_H) >> 7) & enemies, -7),
+            )
+            promotion_rank = RANK_1
+        for targets, offset in captures:
+            self._add_pawn_moves(moves, targets, offset, promotion_rank)
+
+        # En passant: pawns attacking the en passant square (pawns attacking a square
+        # are found from the pawn attacks of the opposite color on that square)
+        if board.en_passant_square:
+            ep_rank, ep_file = board.en_passant_square
+            attackers = PAWN_ATTACKS[1 - color][ep_rank * 8 + ep_file] & pawns
+            while attackers:
+                square_bit = attackers & -attackers
+                square = square_bit.bit_length() - 1
                 moves.append(
                     Move(
-                        rank,
-                        file,
-                        new_rank,
-                        new_file,
+                        square >> 3,
+                        square & 7,
+                        ep_rank,
+                        ep_file,
                         captured_piece_type=PieceType.PAWN,
                         is_en_passant=True,
                     )
                 )
+                attackers ^= square_bit
+
+        if not captures_only:
+            empty = ~board.occupied
+            if color == WHITE:
+                single_pushes = (pawns << 8) & empty
+                double_pushes = ((single_pushes & RANK_3) << 8) & empty
+                pushes = ((single_pushes, 8), (double_pushes, 16))
+            else:
+                single_pushes = (pawns >> 8) & empty
+                double_pushes = ((single_pushes & RANK_6) >> 8) & empty
+                pushes = ((single_pushes, -8), (double_pushes, -16))
+            for targets, offset in pushes:
+                self._add_pawn_moves(moves, targets, offset, promotion_rank)
 
         return moves
 
-    def _generate_knight_moves(self, rank: int, file: int, piece) -> List[Move]:
-        """Generate all knight moves from the given position."""
-        moves = []
-        # Knight moves: 2 squares in one direction, 1 in perpendicular
-        knight_offsets = [
-            (-2, -1),
-            (-2, 1),
-            (-1, -2),
-            (-1, 2),
-            (1, -2),
-            (1, 2),
-            (2, -1),
-            (2, 1),
-        ]
-
-        for dr, df in knight_offsets:
-            new_rank = rank + dr
-            new_file = file + df
-
-            if 0 <= new_rank < 8 and 0 <= new_file < 8:
-                target = self.board.get_piece(new_rank, new_file)
-                if target is None:
-                    moves.append(Move(rank, file, new_rank, new_file))
-                elif target.color != piece.color:
+    def _add_pawn_moves(
+        self, moves: List[Move], targets: int, offset: int, promotion_rank: int
+    ) -> None:
+        """
+        Add a move for every pawn move to a square of targets, from the square
+        `offset` below it, with one move per piece for promotions.
+        """
+        squares = self.board.board
+        while targets:
+            square_bit = targets & -targets
+            square = square_bit.bit_length() - 1
+            from_square = square - offset
+            target = squares[square]
+            captured_piece_type = target.piece_type if target else None
+            if square_bit & promotion_rank:
+                for promo_type in PROMOTION_PIECE_TYPES:
                     moves.append(
                         Move(
-                            rank,
-                            file,
-                            new_rank,
-                            new_file,
-                            captured_piece_type=target.piece_type,
+                            from_square >> 3,
+                            from_square & 7,
+                            square >> 3,
+                            square & 7,
+                            captured_piece_type=captured_piece_type,
+                            promotion_piece_type=promo_type,
                         )
                     )
+            else:
+                moves.append(
+                    Move(
+                        from_square >> 3,
+                        from_square & 7,
+                        square >> 3,
+                        square & 7,
+                        captured_piece_type=captured_piece_type,
+                    )
+                )
+            targets ^= square_bit
 
-        return moves
-
-    def _generate_sliding_moves(
-        self, rank: int, file: int, piece, directions: List[Tuple[int, int]]
-    ) -> List[Move]:
+    def _generate_target_moves(self, rank: int, file: int, targets: int) -> List[Move]:
         """
-        Generate sliding piece moves (bishop, rook, queen).
-
-        Args:
-            rank: Starting rank
-            file: Starting file
-            piece: The piece being moved
-            directions: List of (rank_delta, file_delta) tuples for movement directions
+        Generate moves from the given position to every square of a bitboard,
+        capturing whatever piece is on it.
         """
+        squares = self.board.board
         moves = []
+        while targets:
+            square_bit = targets & -targets
+            square = square_bit.bit_length() - 1
+            target = squares[square]
+            moves.append(
+                Move(
+                    rank,
+                    file,
+                    square >> 3,
+                    square & 7,
+                    captured_piece_type=target.piece_type if target else None,
+                )
+            )
+            targets ^= square_bit
+        return moves
 
-        for dr, df in directions:
-            # Slide in this direction until blocked
-            new_rank = rank + dr
-            new_file = file + df
+    def _slider_attacks(self, square: int, piece_type: PieceType) -> int:
+        """Bitboard of squares a bishop, rook or queen on the square attacks."""
+        occupied = self.board.occupied
+        attacks = 0
+        if piece_type != ROOK:
+            attacks |= BISHOP_ATTACKS[square][occupied & BISHOP_MASKS[square]]
+        if piece_type != BISHOP:
+            attacks |= ROOK_ATTACKS[square][occupied & ROOK_MASKS[square]]
+        return attacks
 
-            while 0 <= new_rank < 8 and 0 <= new_file < 8:
-                target = self.board.get_piece(new_rank, new_file)
+    def _generate_knight_moves(self, rank: int, file: int, piece) -> List[Move]:
+        """Generate all knight moves from the given position."""
+        return self._generate_target_moves(
+            rank,
+            file,
+            KNIGHT_ATTACKS[rank * 8 + file] & ~self.board.occupancy[piece.color],
+        )
 
-                if target is None:
-                    # Empty square - can move here
-                    moves.append(Move(rank, file, new_rank, new_file))
-                elif target.color != piece.color:
-                    # Enemy piece - can capture
-                    moves.append(
-                        Move(
-                            rank,
-                            file,
-                            new_rank,
-                            new_file,
-                            captured_piece_type=target.piece_type,
-                        )
-                    )
-                    break  # Can't move past this piece
-                else:
-                    # Own piece - blocked
-                    break
+    def _generate_knight_captures(self, rank: int, file: int, piece) -> List[Move]:
+        """Generate all knight captures from the given position."""
+        return self._generate_target_moves(
+            rank,
+            file,
+            KNIGHT_ATTACKS[rank * 8 + file] & self.board.occupancy[1 - piece.color],
+        )
 
-                new_rank += dr
-                new_file += df
+    def _generate_king_captures(self, rank: int, file: int, piece) -> List[Move]:
+        """Generate all king captures from the given position."""
+        return self._generate_target_moves(
+            rank,
+            file,
+            KING_ATTACKS[rank * 8 + file] & self.board.occupancy[1 - piece.color],
+        )
 
-        return moves
+    def _generate_sliding_moves(self, rank: int, file: int, piece) -> List[Move]:
+        """
+        Generate sliding piece moves (bishop, rook, queen): every attacked square
+        not occupied by an own piece.
+        """
+        attacks = self._slider_attacks(rank * 8 + file, piece.piece_type)
+        return self._generate_target_moves(
+            rank, file, attacks & ~self.board.occupancy[piece.color]
+        )
 
-    def _generate_bishop_moves(self, rank: int, file: int, piece) -> List[Move]:
-        """Generate all bishop moves from the given position."""
-        # Diagonal directions
-        directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]
-        return self._generate_sliding_moves(rank, file, piece, directions)
-
-    def _generate_rook_moves(self, rank: int, file: int, piece) -> List[Move]:
-        """Generate all rook moves from the given position."""
-        # Horizontal and vertical directions
-        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
-        return self._generate_sliding_moves(rank, file, piece, directions)
-
-    def _generate_queen_moves(self, rank: int, file: int, piece) -> List[Move]:
-        """Generate all queen moves from the given position."""
-        # All eight directions (combination of rook and bishop)
-        directions = [
-            (-1, -1),
-            (-1, 0),
-            (-1, 1),
-            (0, -1),
-            (0, 1),
-            (1, -1),
-            (1, 0),
-            (1, 1),
-        ]
-        return self._generate_sliding_moves(rank, file, piece, directions)
+    def _generate_sliding_captures(self, rank: int, file: int, piece) -> List[Move]:
+        """Generate sliding piece captures: attacked squares holding an enemy."""
+        attacks = self._slider_attacks(rank * 8 + file, piece.piece_type)
+        return self._generate_target_moves(
+            rank, file, attacks & self.board.occupancy[1 - piece.color]
+        )
 
     def _generate_king_moves(self, rank: int, file: int, piece) -> List[Move]:
         """Generate all king moves from the given position, including castling."""
-        moves = []
-
         # Regular king moves (one square in any direction)
-        for dr in [-1, 0, 1]:
-            for df in [-1, 0, 1]:
-                if dr == 0 and df == 0:
-                    continue
-
-                new_rank = rank + dr
-                new_file = file + df
-
-                if 0 <= new_rank < 8 and 0 <= new_file < 8:
-                    target = self.board.get_piece(new_rank, new_file)
-                    if target is None:
-                        moves.append(Move(rank, file, new_rank, new_file))
-                    elif target.color != piece.color:
-                        moves.append(
-                            Move(
-                                rank,
-                                file,
-                                new_rank,
-                                new_file,
-                                captured_piece_type=target.piece_type,
-                            )
-                        )
+        moves = self._generate_target_moves(
+            rank,
+            file,
+            KING_ATTACKS[rank * 8 + file] & ~self.board.occupancy[piece.color],
+        )
 
         # Castling
         moves.extend(self._generate_castling_moves(rank, file, piece))
@@ -319,7 +357,7 @@ class MoveGenerator:
         """Generate castling moves for the king."""
         moves = []
         color = piece.color
-        opponent_color = Color.BLACK if color == Color.WHITE else Color.WHITE
+        opponent_color = OPPONENT[color]
 
         # Can't castle if king is in check
         if self.board.is_square_attacked(rank, file, opponent_color):
@@ -327,7 +365,7 @@ class MoveGenerator:
 
         # Check kingside castling
         if (
-            self.board.castling_rights[color]["kingside"]
+            self.board.castling & KINGSIDE_CASTLING[color]
             and self.board.get_piece(rank, 5) is None
             and self.board.get_piece(rank, 6) is None
             and not self.board.is_square_attacked(rank, 5, opponent_color)
@@ -337,7 +375,7 @@ class MoveGenerator:
 
         # Check queenside castling
         if (
-            self.board.castling_rights[color]["queenside"]
+            self.board.castling & QUEENSIDE_CASTLING[color]
             and self.board.get_piece(rank, 1) is None
             and self.board.get_piece(rank, 2) is None
             and self.board.get_piece(rank, 3) is None
@@ -348,6 +386,29 @@ class MoveGenerator:
 
         return moves
 
+    def _filter_legal(self, moves: List[Move]) -> List[Move]:
+        """
+        Keep the legal moves of the side to move among pseudo-legal moves. Most are
+        decided by the board's check and pin masks (see Board.legality_masks); king
+        moves and en passant captures, which those masks don't cover, are made and
+        tested with _is_legal.
+        """
+        king_square, check_mask, pin_rays = self.board.legality_masks()
+        legal_moves = []
+        for move in moves:
+            key = move.key
+            from_square = (key >> 6) & 63
+            if from_square == king_square or move.is_en_passant:
+                if self._is_legal(move):
+                    legal_moves.append(move)
+                continue
+            to_bit = 1 << (key & 63)
+            if to_bit & check_mask and (
+                from_square not in pin_rays or to_bit & pin_rays[from_square]
+            ):
+                legal_moves.append(move)
+        return legal_moves
+
     def _is_legal(self, move: Move) -> bool:
         """
         Check if a move is legal (doesn't leave own king in check).
@@ -5,6 +5,11 @@ Piece representation for the chess engine.
 from src.core.constants import Color, PieceType
 
 
+def bitboard_index(piece_type: PieceType, color: Color) -> int:
+    """Index of the bitboard for pieces of this type and color (0-11)."""
+    return color * 6 + piece_type - 1
+
+
 class Piece:
     """
     Represents a chess piece.
@@ -13,6 +18,16 @@ class Piece:
     This makes move generation and board updates simpler.
     """
 
+    # Fixed attributes: smaller instances and faster attribute access
+    __slots__ = (
+        "color",
+        "piece_type",
+        "id",
+        "centipawn_value",
+        "char",
+        "bitboard_index",
+    )
+
     def __init__(self, piece_type: PieceType, color: Color):
         """
         Initialize a chess piece.
@@ -26,6 +41,8 @@ class Piece:
         self.id = piece_type.id
         self.centipawn_value = piece_type.centipawn_value
         self.char = piece_type.char
+        # Index of this piece's bitboard in Board.bitboards
+        self.bitboard_index = bitboard_index(piece_type, color)
 
     def __repr__(self):
         """String representation of the piece."""
@@ -51,6 +68,13 @@ class Piece:
         Check equality based on piece type and color.
         Note: This does not consider position, this is handled by the Board.
         """
+        if self is other:
+            return True
         if not isinstance(other, Piece):
             return False
         return self.piece_type == other.piece_type and self.color == other.color
+
+
+# The 12 distinct pieces, indexed by bitboard_index. Pieces carry no position, so
+# the board shares these instances instead of allocating a Piece per placement
+PIECES = tuple(Piece(piece_type, color) for color in Color for piece_type in PieceType)
@@ -0,0 +1,25 @@
+"""
+Zobrist hashing keys for the chess engine.
+
+A position's hash is the XOR of the keys of every piece on its square, plus
+the side to move, castling rights and en passant file. Keys are fixed at
+import time (seeded), so hashes are reproducible between runs.
+
+References:
+- Zobrist hashing: https://www.chessprogramming.org/Zobrist_Hashing
+"""
+
+import random
+
+_rng = random.Random(0x5EED)
+
+# Indexed by [Piece.bitboard_index][rank * 8 + file]
+PIECE_SQUARE_KEYS = tuple(
+    tuple(_rng.getrandbits(64) for _ in range(64)) for _ in range(12)
+)
+# XORed in when it is black to move
+SIDE_KEY = _rng.getrandbits(64)
+# Indexed by Board.castling (4 bits)
+CASTLING_KEYS = tuple(_rng.getrandbits(64) for _ in range(16))
+# Indexed by the en passant file
+EN_PASSANT_KEYS = tuple(_rng.getrandbits(64) for _ in range(8))
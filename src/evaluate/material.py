@@ -1,21 +1,12 @@
-from src import Board, Color
+from src import Board
 
 
 def evaluate(board: Board) -> int:
     """
-    Simple material evaluation.
+    Simple material evaluation, kept up to date by Board.set_piece as pieces
+    are placed and removed.
 
     Returns:
         Evaluation score in centipawns
     """
-    score = 0
-    for rank in range(8):
-        for file in range(8):
-            piece = board.get_piece(rank, file)
-            if piece:
-                value = piece.piece_type.centipawn_value
-                if piece.color == Color.WHITE:
-                    score += value
-                else:
-                    score -= value
-    return score
+    return board.material_score
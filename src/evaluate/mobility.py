@@ -1,41 +1,119 @@
 # src/evaluate/mobility.py
-from src import Board, Color, MoveGenerator, PieceType
+from src import Board, Color
+from src.core.constants import WHITE, BLACK, PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING
+from src.core.attacks import (
+    BISHOP_ATTACKS,
+    BISHOP_MASKS,
+    KING_ATTACKS,
+    KNIGHT_ATTACKS,
+    NOT_FILE_A,
+    NOT_FILE_H,
+    PAWN_ATTACKS,
+    RANK_1,
+    RANK_3,
+    RANK_6,
+    RANK_8,
+    ROOK_ATTACKS,
+    ROOK_MASKS,
+)
 from .utils import is_endgame
 
-
 MOBILITY_WEIGHT = 3  # ~3-7 centipawns is common
 
 
 def evaluate(board: Board) -> int:
     """
-    Evaluate mobility (number of legal moves difference between White and Black).
-    TODO: Invest in optimizations to avoid generating all moves each evaluation.
-    This can include caching legal moves into the Board class, including legal-move
-    restoration after making/unmaking moves.
+    Evaluate mobility (number of pseudo-legal moves difference between White and Black).
+    Moves are counted straight from the bitboards and attack tables, without
+    generating Move objects.
     """
-    # Generate all pseudo-legal moves instead of legal moves for efficiency
-    movegen = MoveGenerator(board)
-
-    white_moves = movegen.generate_pseudo_legal_moves_for_color(Color.WHITE)
-    black_moves = movegen.generate_pseudo_legal_moves_for_color(Color.BLACK)
-
-    white_move_count = len(white_moves)
-    black_move_count = len(black_moves)
-
     # In early/midgame, king safety is more important than king mobility
     # Hence, do not count king moves unless in endgame
-    if not is_endgame(board):
-        # Discard white king moves
-        for move in white_moves:
-            piece = board.get_piece(move.from_rank, move.from_file)
-            if piece and piece.piece_type == PieceType.KING:
-                white_move_count -= 1
-
-        # Discard black king moves
-        for move in black_moves:
-            piece = board.get_piece(move.from_rank, move.from_file)
-            if piece and piece.piece_type == PieceType.KING:
-                black_move_count -= 1
+    count_king_moves = is_endgame(board)
+
+    white_move_count = _count_moves(board, WHITE, count_king_moves)
+    black_move_count = _count_moves(board, BLACK, count_king_moves)
 
     score = (white_move_count - black_move_count) * MOBILITY_WEIGHT
     return score
+
+
+def _count_moves(board: Board, color: Color, count_king_moves: bool) -> int:
+    """
+    Count the pseudo-legal moves of the given color, each promotion piece counting
+    as a move. King moves are one-square steps only (no castling).
+    """
+    occupied = board.occupied
+    targets = ~board.occupancy[color]  # Empty or enemy squares
+    count = 0
+
+    # Pawns: whole-board pushes and captures by shifting the pawn bitboard
+    count += _count_pawn_moves(board, color)
+
+    # Pieces: attacked squares not occupied by own pieces
+    bitboard = board.get_bitboard(KNIGHT, color)
+    while bitboard:
+        square_bit = bitboard & -bitboard
+        count += (KNIGHT_ATTACKS[square_bit.bit_length() - 1] & targets).bit_count()
+        bitboard ^= square_bit
+    for piece_type, tables in (
+        (BISHOP, ((BISHOP_ATTACKS, BISHOP_MASKS),)),
+        (ROOK, ((ROOK_ATTACKS, ROOK_MASKS),)),
+        (QUEEN, ((BISHOP_ATTACKS, BISHOP_MASKS), (ROOK_ATTACKS, ROOK_MASKS))),
+    ):
+        bitboard = board.get_bitboard(piece_type, color)
+        while bitboard:
+            square_bit = bitboard & -bitboard
+            square = square_bit.bit_length() - 1
+            for attacks, masks in tables:
+                count += (
+                    attacks[square][occupied & masks[square]] & targets
+                ).bit_count()
+            bitboard ^= square_bit
+    if count_king_moves:
+        bitboard = board.get_bitboard(KING, color)
+        while bitboard:
+            square_bit = bitboard & -bitboard
+            count += (KING_ATTACKS[square_bit.bit_length() - 1] & targets).bit_count()
+            bitboard ^= square_bit
+
+    return count
+
+
+def _count_pawn_moves(board: Board, color: Color) -> int:
+    """Count pawn pushes, double pushes, captures and en passant captures of a color."""
+    pawns = board.get_bitboard(PAWN, color)
+    empty = ~board.occupied
+    enemies = board.occupancy[1 - color]
+
+    if color == WHITE:
+        single_pushes = (pawns << 8) & empty
+        double_pushes = ((single_pushes & RANK_3) << 8) & empty
+        captures = (
+            ((pawns & NOT_FILE_A) << 7) & enemies,
+            ((pawns & NOT_FILE_H) << 9) & enemies,
+        )
+        promotion_rank = RANK_8
+    else:
+        single_pushes = (pawns >> 8) & empty
+        double_pushes = ((single_pushes & RANK_6) >> 8) & empty
+        captures = (
+            ((pawns & NOT_FILE_A) >> 9) & enemies,
+            ((pawns & NOT_FILE_H) >> 7) & enemies,
+        )
+        promotion_rank = RANK_1
+
+    # Every move onto the promotion rank is four moves, one per promotion piece
+    count = single_pushes.bit_count() + 3 * (single_pushes & promotion_rank).bit_count()
+    count += double_pushes.bit_count()
+    for capture_targets in captures:
+        count += capture_targets.bit_count()
+        count += 3 * (capture_targets & promotion_rank).bit_count()
+
+    # En passant: pawns attacking the en passant square (pawns attacking a square
+    # are found from the pawn attacks of the opposite color on that square)
+    if board.en_passant_square:
+        ep_rank, ep_file = board.en_passant_square
+        count += (PAWN_ATTACKS[1 - color][ep_rank * 8 + ep_file] & pawns).bit_count()
+
+    return count
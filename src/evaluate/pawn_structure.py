@@ -1,5 +1,6 @@
 from collections import defaultdict
-from src import Board, Color, PieceType
+from src import Board, Color
+from src.core.constants import WHITE, BLACK, PAWN
 
 # Pawn structure weights
 ISOLATED_PAWN_PENALTY = 20
@@ -14,23 +15,25 @@ def evaluate(board: Board) -> int:
     """
     score = 0
 
-    white_pawns, black_pawns = [], []
-    for rank in range(8):
-        for file in range(8):
-            piece = board.get_piece(rank, file)
-            if not piece or piece.piece_type != PieceType.PAWN:
-                continue
-            if piece.color == Color.WHITE:
-                white_pawns.append((rank, file))
-            else:
-                black_pawns.append((rank, file))
+    white_pawns = _pawn_squares(board.get_bitboard(PAWN, WHITE))
+    black_pawns = _pawn_squares(board.get_bitboard(PAWN, BLACK))
 
-    score += _evaluate_pawns(white_pawns, black_pawns, Color.WHITE)
-    score -= _evaluate_pawns(black_pawns, white_pawns, Color.BLACK)
+    score += _evaluate_pawns(white_pawns, black_pawns, WHITE)
+    score -= _evaluate_pawns(black_pawns, white_pawns, BLACK)
 
     return score
 
 
+def _pawn_squares(bitboard: int) -> list:
+    """(rank, file) of each pawn on a pawn bitboard."""
+    pawns = []
+    while bitboard:
+        square_bit = bitboard & -bitboard  # Lowest set bit
+        pawns.append(divmod(square_bit.bit_length() - 1, 8))
+        bitboard ^= square_bit
+    return pawns
+
+
 def _evaluate_pawns(pawns, opponent_pawns, color: Color) -> int:
     """Return pawn structure score for given color"""
     score = 0
@@ -52,7 +55,7 @@ def _evaluate_pawns(pawns, opponent_pawns, color: Color) -> int:
         # Passed pawn
         if _is_passed((rank, file), opponent_pawns, color):
             # Rank-dependent bonus
-            index = rank if color == Color.WHITE else 7 - rank
+            index = rank if color == WHITE else 7 - rank
             score += PASSED_PAWN_BONUS[index]
 
     return score
@@ -63,8 +66,8 @@ def _is_passed(pawn, opponent_pawns, color: Color) -> bool:
     rank, file = pawn
     for other_rank, other_file in opponent_pawns:
         if abs(other_file - file) <= 1:
-            if color == Color.WHITE and other_rank > rank:
+            if color == WHITE and other_rank > rank:
                 return False
-            if color == Color.BLACK and other_rank < rank:
+            if color == BLACK and other_rank < rank:
                 return False
     return True
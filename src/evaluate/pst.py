@@ -1,4 +1,5 @@
 from src import Board, Color, PieceType
+from src.core.constants import WHITE, KING
 from .utils import is_endgame
 
 # Pawns
@@ -114,19 +115,14 @@ def evaluate(board: Board) -> int:
     Piece-Square Table (PST) evaluation.
     This technique assigns values to pieces based on their positions on the board.
     """
-    endgame = is_endgame(board)
+    square_tables = SQUARE_TABLES[is_endgame(board)]
 
     score = 0
-    for rank in range(8):
-        for file in range(8):
-            piece = board.get_piece(rank, file)
-            if not piece:
-                continue
-
-            if piece.color == Color.WHITE:
-                score += handle_white_piece(piece.piece_type, rank, file, endgame)
-            else:
-                score -= handle_black_piece(piece.piece_type, rank, file, endgame)
+    for bitboard, square_table in zip(board.bitboards, square_tables):
+        while bitboard:
+            square_bit = bitboard & -bitboard  # Lowest set bit
+            score += square_table[square_bit.bit_length() - 1]
+            bitboard ^= square_bit
 
     return score
 
@@ -135,7 +131,7 @@ def handle_white_piece(piece_type, rank, file, is_endgame=False) -> int:
     """
     Get the PST value for a white piece based on its type and position.
     """
-    if piece_type == PieceType.KING:
+    if piece_type == KING:
         return (
             KING_ENDGAME_TABLE_WHITE[rank][file]
             if is_endgame
@@ -149,7 +145,7 @@ def handle_black_piece(piece_type, rank, file, is_endgame=False) -> int:
     """
     Get the PST value for a black piece based on its type and position.
     """
-    if piece_type == PieceType.KING:
+    if piece_type == KING:
         return (
             KING_ENDGAME_TABLE_BLACK[rank][file]
             if is_endgame
@@ -157,3 +153,29 @@ def handle_black_piece(piece_type, rank, file, is_endgame=False) -> int:
         )
 
     return BLACK_PST_TABLES[piece_type][rank][file]
+
+
+def _signed_square_table(piece_type, color, is_endgame) -> tuple:
+    """
+    PST values for one piece type and color, flattened to 64 squares
+    (rank * 8 + file) and negated for black.
+    """
+    sign = 1 if color == WHITE else -1
+    handle_piece = handle_white_piece if color == WHITE else handle_black_piece
+    return tuple(
+        sign * handle_piece(piece_type, rank, file, is_endgame)
+        for rank in range(8)
+        for file in range(8)
+    )
+
+
+# Flattened, signed tables indexed by [is_endgame][Piece.bitboard_index][square],
+# so evaluation only visits occupied squares, via the board's bitboards
+SQUARE_TABLES = tuple(
+    tuple(
+        _signed_square_table(piece_type, color, is_endgame)
+        for color in Color
+        for piece_type in PieceType
+    )
+    for is_endgame in (False, True)
+)
@@ -0,0 +1,76 @@
+import threading
+from src import Board, MinimaxAgent
+from src.core.board import STARTING_FEN
+
+# Leaf positions a plain (unpruned) minimax visits at depth 3 from the start position
+PERFT_3_STARTING_POSITION = 8902
+
+
+def test_alpha_beta_prunes_search():
+    """
+    Test alpha-beta pruning keeps MinimaxAgent well under the full-width node count
+    at depth 3 from the starting position, quiescence nodes included.
+    """
+    board = Board()
+    board.setup_initial_position()
+    agent = MinimaxAgent(board)
+
+    best_move = agent.find_best_move(3)
+    assert best_move is not None
+
+    assert 0 < agent.nodes_searched < PERFT_3_STARTING_POSITION, (
+        f"Expected fewer than {PERFT_3_STARTING_POSITION} nodes, "
+        f"searched {agent.nodes_searched}"
+    )
+
+
+def test_killer_moves_ordered_first_among_quiet_moves():
+    """
+    Test a quiet move that caused a cutoff at some ply is ordered before all other
+    quiet moves at that ply, but after captures.
+    """
+    board = Board()
+    board.from_fen("4k3/8/8/3p4/4P3/8/8/4K2N w - - 0 1")
+    agent = MinimaxAgent(board)
+
+    killer = next(
+        move for move in agent.get_legal_moves() if str(move).startswith("h1 -> g3")
+    )
+    agent.record_cutoff(killer, 1, 2)
+
+    ordered = agent.get_legal_moves(2)
+    assert ordered[0].captured_piece_type is not None
+    assert ordered[1] == killer
+
+
+def test_parallel_root_search():
+    """
+    Test MinimaxAgent searching root moves in worker processes returns a legal move
+    and counts the nodes the workers searched.
+    """
+    board = Board()
+    board.setup_initial_position()
+    with MinimaxAgent(board, processes=2) as agent:
+        best_move = agent.find_best_move(3)
+        assert best_move in board.movegen.generate_legal_moves()
+        assert agent.nodes_searched > 0
+        assert board.to_fen() == STARTING_FEN  # Workers searched their own copies
+
+
+def test_parallel_root_search_stops_workers():
+    """
+    Test setting the stop event of MinimaxAgent also stops its worker processes:
+    none of them is still searching once find_best_move returns.
+    """
+    board = Board()
+    board.setup_initial_position()
+    with MinimaxAgent(board, processes=2) as agent:
+        timer = threading.Timer(1, agent.stop_event.set)
+        timer.start()
+        best_move = agent.find_best_move(10)
+        timer.join()
+        assert best_move in board.movegen.generate_legal_moves()
+
+        # Both workers are idle, so both trivial tasks run right away
+        futures = [agent.process_pool.submit(abs, -1) for _ in range(2)]
+        assert [future.result(timeout=1) for future in futures] == [1, 1]
@@ -1,5 +1,6 @@
 import pytest
 from src import Board, MoveGenerator, Color, PieceType, RandomAgent
+from src.core.constants import WHITE_KINGSIDE
 from random import choice as random_choice
 
 
@@ -172,6 +173,26 @@ def test_insufficient_material():
     assert board.is_game_over()
 
 
+@pytest.mark.parametrize(
+    "fen, expected",
+    [
+        ("7k/8/8/8/8/8/8/KN6 w - - 0 1", True),  # King and knight vs king
+        ("7k/8/8/8/8/8/8/KB6 w - - 0 1", True),  # King and bishop vs king
+        ("7k/8/8/8/8/8/8/KR6 w - - 0 1", False),  # King and rook vs king
+        ("7k/8/8/8/8/8/P7/K7 w - - 0 1", False),  # King and pawn vs king
+        ("6bk/8/8/8/8/8/8/KB6 w - - 0 1", True),  # Bishops on same color squares
+        ("5b1k/8/8/8/8/8/8/KB6 w - - 0 1", False),  # Bishops on opposite colors
+        ("6nk/8/8/8/8/8/8/KN6 w - - 0 1", False),  # Knight each
+    ],
+)
+def test_insufficient_material_with_minor_pieces(fen, expected):
+    """Test insufficient material with a minor piece or two left."""
+    board = Board()
+    board.from_fen(fen)
+
+    assert board.is_insufficient_material() == expected
+
+
 def test_50_move_rule():
     """Test 50-move rule."""
     board = Board()
@@ -294,7 +315,7 @@ def test_castling_rights_after_rook_move():
     movegen = MoveGenerator(board)
 
     # Initial state: white can castle kingside and queenside
-    assert board.castling_rights[Color.WHITE]["kingside"]
+    assert board.castling & WHITE_KINGSIDE
     assert board.get_move_from_uci("e1g1") in movegen.generate_legal_moves()
 
     # Move the kingside rook forward 1 square
@@ -310,20 +331,39 @@ def test_castling_rights_after_rook_move():
     board.make_move(rook_move_back)
 
     # Kingside castling should now be unavailable
-    assert not board.castling_rights[Color.WHITE]["kingside"]
+    assert not board.castling & WHITE_KINGSIDE
     assert board.get_move_from_uci("e1g1") not in movegen.generate_legal_moves()
     _, _, castling_rights, _, _, _ = board.to_fen().split(" ")
     assert castling_rights == "-", f"Expected no castling rights, got {castling_rights}"
 
 
+def test_castling_rights_after_other_rook_move():
+    """
+    Test that only moves from or to the rooks' starting squares take castling rights:
+    another rook leaving the same file, or a rook captured elsewhere, does not.
+    """
+    board = Board()
+    board.from_fen("r3k2r/8/8/R6r/8/8/8/R3K2R w KQkq - 0 1")
+
+    board.make_move(board.get_move_from_uci("a5b5"))
+    assert board.to_fen().split(" ")[2] == "KQkq"
+    board.make_move(board.get_move_from_uci("h5b5"))  # Captures the rook off a1
+    assert board.to_fen().split(" ")[2] == "KQkq"
+
+    # Capturing a rook on its starting square takes that side's right away
+    board.make_move(board.get_move_from_uci("a1a8"))
+    assert board.to_fen().split(" ")[2] == "Kk"
+
+
 @pytest.mark.parametrize("num_moves", [100])
-def test_fen_history(num_moves):
+def test_hash_history(num_moves):
     """
-    Test FEN history tracking by having a RandomAgent play a few moves & unmaking them.
+    Test position history tracking by having a RandomAgent play a few moves & unmaking them.
     """
     board = Board()
     board.setup_initial_position()
     agent = RandomAgent(board)
+    initial_hash = board.hash_key
 
     move_count = 0
     for _ in range(num_moves):
@@ -332,17 +372,125 @@ def test_fen_history(num_moves):
             break  # No legal moves, game over
         board.make_move(move)
         move_count += 1
+        assert board.hash_history[-1] == board.hash_key
+        assert len(board.hash_history) == move_count + 1
 
     for _ in range(move_count):
         board.unmake_move()
 
-    # Initial position FEN
-    initial_fen = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq -"
-    assert (
-        board.fen_history[initial_fen] == 1
-    ), "FEN history should track initial position once"
+    assert board.hash_history == [
+        initial_hash
+    ], "Position history should only hold the initial position after unmaking"
 
-    del board.fen_history[initial_fen]
-    assert (
-        max(board.fen_history.values(), default=0) == 0
-    ), "FEN history should be empty after deletions"
+
+@pytest.mark.parametrize("num_moves", [100])
+def test_zobrist_hash(num_moves):
+    """
+    Test the incrementally updated Zobrist hash matches a from-scratch hash while
+    a RandomAgent plays, and is restored when the moves are unmade.
+    """
+    board = Board()
+    board.setup_initial_position()
+    agent = RandomAgent(board)
+    initial_hash = board.hash_key
+    assert initial_hash == board.compute_hash()
+
+    move_count = 0
+    for _ in range(num_moves):
+        move = agent.find_best_move(0)
+        if move is None:
+            break  # No legal moves, game over
+        board.make_move(move)
+        move_count += 1
+        assert board.hash_key == board.compute_hash(), f"Hash mismatch after {move}"
+
+        # Same position loaded from FEN should hash (and count material) the same
+        fen_board = Board()
+        fen_board.from_fen(board.to_fen())
+        assert fen_board.hash_key == board.hash_key
+        assert fen_board.material_score == board.material_score
+
+    for _ in range(move_count):
+        board.unmake_move()
+
+    assert board.hash_key == initial_hash
+
+
+def test_null_move():
+    """
+    Test a null move passes the turn, clears en passant, hashes like the same
+    position loaded from FEN, counts as a ply in the hash history, and is fully
+    undone by unmake_null_move.
+    """
+    board = Board()
+    board.from_fen("4k3/8/8/3pP3/8/8/8/4K3 w - d6 0 1")
+    fen = board.to_fen()
+    hash_key = board.hash_key
+
+    en_passant_square = board.make_null_move()
+    assert board.turn == Color.BLACK
+    assert board.en_passant_square is None
+    assert board.hash_key == board.compute_hash()
+    fen_board = Board()
+    fen_board.from_fen("4k3/8/8/3pP3/8/8/8/4K3 b - - 0 1")
+    assert fen_board.hash_key == board.hash_key
+    assert board.hash_history[-1] == board.hash_key
+    assert board.halfmove_clock == 1
+
+    board.unmake_null_move(en_passant_square)
+    assert board.to_fen() == fen
+    assert board.hash_key == hash_key
+    assert board.hash_history[-1] == hash_key
+
+
+@pytest.mark.parametrize("num_moves", [100])
+def test_legal_captures(num_moves):
+    """
+    Test generate_legal_captures matches the captures among all legal moves,
+    and has_legal_move agrees with generate_legal_moves, during a random game.
+    """
+    board = Board()
+    board.setup_initial_position()
+    movegen = MoveGenerator(board)
+    agent = RandomAgent(board)
+
+    for _ in range(num_moves):
+        legal_moves = movegen.generate_legal_moves()
+        expected = {move for move in legal_moves if move.captured_piece_type}
+        assert set(movegen.generate_legal_captures()) == expected
+        assert movegen.has_legal_move() == bool(legal_moves)
+
+        move = agent.find_best_move(0)
+        if move is None:
+            break  # No legal moves, game over
+        board.make_move(move)
+
+
+@pytest.mark.parametrize(
+    "fen",
+    [
+        # Bishop (e2) pinned on the file, knight (d2) pinned on the diagonal
+        "4r3/8/8/q7/8/8/3NB3/4K3 w - - 0 1",
+        # Single check: block or capture the checker, or move the king
+        "4k3/8/8/8/1b6/8/4N3/R3K3 w - - 0 1",
+        # Double check: king moves only
+        "4k3/8/8/8/1b6/8/4r3/R2NK3 w - - 0 1",
+        # En passant capture that would expose the king along the rank
+        "8/8/8/K1pP3r/8/8/8/7k w - c6 0 1",
+    ],
+)
+def test_legal_moves_with_checks_and_pins(fen):
+    """
+    Test the check and pin masks keep exactly the moves that don't leave the king
+    in check, as found by making each pseudo-legal move.
+    """
+    board = Board()
+    board.from_fen(fen)
+    movegen = MoveGenerator(board)
+
+    expected = {
+        move
+        for move in movegen.generate_pseudo_legal_moves()
+        if movegen._is_legal(move)
+    }
+    assert set(movegen.generate_legal_moves()) == expected
@@ -0,0 +1,20 @@
+from lichess.game import MOVE_OVERHEAD_MS, MOVES_TO_GO, move_budget_ms
+
+
+def test_move_budget():
+    """Test the move budget is a share of the clock plus the increment."""
+    assert move_budget_ms(60_000, 1_000) == 60_000 / MOVES_TO_GO + 1_000
+
+
+def test_move_budget_with_increment_above_clock():
+    """
+    Test the move budget stays within the clock left when the increment is larger,
+    as the increment is only added once the move is made.
+    """
+    time_ms, inc_ms = 1_000, 2_000
+    budget_ms = move_budget_ms(time_ms, inc_ms)
+    assert budget_ms < time_ms
+    assert budget_ms == time_ms - MOVE_OVERHEAD_MS
+
+    # Nearly flagged: move right away
+    assert move_budget_ms(MOVE_OVERHEAD_MS / 2, inc_ms) == 0